@@ -0,0 +1,163 @@
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from . import models
+
+DURACAO_PADRAO_MINUTOS = 30
+DURACAO_MAXIMA_MINUTOS = 240
+
+# Expediente usado para gerar os horários livres
+INICIO_EXPEDIENTE = time(8, 0)
+FIM_EXPEDIENTE = time(18, 0)
+
+PERIODO_MAXIMO_DISPONIBILIDADE = timedelta(days=31)
+
+Intervalo = Tuple[datetime, datetime]
+
+
+def sem_fuso(valor: datetime) -> datetime:
+    # As datas são gravadas em UTC sem fuso; valores com fuso são convertidos
+    if valor.tzinfo is None:
+        return valor
+    return valor.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def fim_da_consulta(consulta: models.Consulta) -> datetime:
+    return consulta.data_hora + timedelta(minutes=consulta.duracao_minutos)
+
+
+def consultas_agendadas(
+    db: Session,
+    profissional_ids: Iterable[int],
+    de: datetime,
+    ate: datetime,
+) -> List[models.Consulta]:
+    """
+    Consultas AGENDADAS dos profissionais que podem ocupar algum ponto de [de, ate).
+    Como a duração é limitada, basta buscar as que começam a partir de
+    de - DURACAO_MAXIMA, o que mantém a busca como range scan no índice
+    (profissional_id, data_hora, status).
+    """
+    return (
+        db.query(models.Consulta)
+        .filter(
+            models.Consulta.profissional_id.in_(list(profissional_ids)),
+            models.Consulta.data_hora > de - timedelta(minutes=DURACAO_MAXIMA_MINUTOS),
+            models.Consulta.data_hora < ate,
+            models.Consulta.status == models.StatusConsultaEnum.AGENDADA,
+        )
+        .order_by(models.Consulta.profissional_id, models.Consulta.data_hora)
+        .all()
+    )
+
+
+def travar_profissionais(db: Session, profissional_ids: Iterable[int]) -> None:
+    """
+    Serializa agendamentos concorrentes dos profissionais até o fim da transação.
+    No PostgreSQL é um SELECT ... FOR UPDATE nas linhas. O SQLite não tem trava
+    de linha (ignora o FOR UPDATE), então um UPDATE sem efeito obtém a trava de
+    escrita do banco antes da verificação de conflito.
+    """
+    ids = list(profissional_ids)
+    if not ids:
+        return
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(
+            update(models.Profissional)
+            .where(models.Profissional.id.in_(ids))
+            .values(ativo=models.Profissional.ativo)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        db.query(models.Profissional.id).filter(
+            models.Profissional.id.in_(ids)
+        ).with_for_update().all()
+
+
+def buscar_conflito(
+    db: Session,
+    profissional_id: int,
+    inicio: datetime,
+    duracao_minutos: int,
+) -> Optional[models.Consulta]:
+    """
+    Retorna uma consulta agendada do profissional que se sobreponha
+    ao intervalo [inicio, inicio + duração), se houver.
+    """
+    fim = inicio + timedelta(minutes=duracao_minutos)
+    for consulta in consultas_agendadas(db, [profissional_id], inicio, fim):
+        if consulta.data_hora < fim and fim_da_consulta(consulta) > inicio:
+            return consulta
+    return None
+
+
+def _mesclar(intervalos: List[Intervalo]) -> List[Intervalo]:
+    mesclados: List[Intervalo] = []
+    for inicio, fim in sorted(intervalos):
+        if mesclados and inicio <= mesclados[-1][1]:
+            mesclados[-1] = (mesclados[-1][0], max(mesclados[-1][1], fim))
+        else:
+            mesclados.append((inicio, fim))
+    return mesclados
+
+
+def horarios_livres(
+    ocupados: List[Intervalo],
+    de: datetime,
+    ate: datetime,
+    duracao_minutos: int,
+    agora: datetime,
+) -> List[Intervalo]:
+    """
+    Varre o período dia a dia gerando horários de `duracao_minutos` dentro do
+    expediente e descartando os que tocam algum intervalo ocupado.
+    Os ocupados são mesclados e percorridos uma única vez (two-pointer).
+    """
+    passo = timedelta(minutes=duracao_minutos)
+    ocupados = _mesclar(ocupados)
+    livres: List[Intervalo] = []
+    i = 0
+
+    dia = de.date()
+    while dia <= ate.date():
+        inicio_dia = datetime.combine(dia, INICIO_EXPEDIENTE)
+        fim_dia = min(datetime.combine(dia, FIM_EXPEDIENTE), ate)
+        limite_inferior = max(de, agora)
+
+        slot = inicio_dia
+        while slot + passo <= fim_dia:
+            fim_slot = slot + passo
+            if slot >= limite_inferior:
+                while i < len(ocupados) and ocupados[i][1] <= slot:
+                    i += 1
+                if i >= len(ocupados) or ocupados[i][0] >= fim_slot:
+                    livres.append((slot, fim_slot))
+            slot = fim_slot
+        dia += timedelta(days=1)
+    return livres
+
+
+def disponibilidade(
+    db: Session,
+    profissional_ids: List[int],
+    de: datetime,
+    ate: datetime,
+    duracao_minutos: int = DURACAO_PADRAO_MINUTOS,
+) -> Dict[int, List[Intervalo]]:
+    """
+    Horários livres de vários profissionais com uma única consulta ao banco.
+    """
+    ocupados: Dict[int, List[Intervalo]] = {pid: [] for pid in profissional_ids}
+    for consulta in consultas_agendadas(db, profissional_ids, de, ate):
+        ocupados[consulta.profissional_id].append(
+            (consulta.data_hora, fim_da_consulta(consulta))
+        )
+
+    agora = datetime.utcnow()
+    return {
+        pid: horarios_livres(intervalos, de, ate, duracao_minutos, agora)
+        for pid, intervalos in ocupados.items()
+    }
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal, get_db
+from . import models, senhas
+from .cache import Principal, cache_principais
+
+SECRET_KEY = "MINHA_CHAVE_SUPER_SECRETA_SGHSS_123456"
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+
+async def verificar_senha(plain_password: str, stored_password: str) -> bool:
+    # bcrypt no pool de processos (aceita também senhas legadas em texto puro)
+    return await senhas.verificar(plain_password, stored_password)
+
+
+async def rehash_senha(usuario_id: int, senha: str) -> None:
+    """
+    Regrava a senha com o hash/custo atual. Roda em segundo plano após um
+    login bem-sucedido; se o pool estiver saturado, fica para o próximo login.
+    """
+    try:
+        novo_hash = await senhas.gerar_hash(senha)
+    except senhas.PoolSenhasSaturado:
+        return
+    await run_in_threadpool(_gravar_hash, usuario_id, novo_hash)
+
+
+def _gravar_hash(usuario_id: int, novo_hash: str) -> None:
+    db = SessionLocal()
+    try:
+        db.query(models.Usuario).filter(models.Usuario.id == usuario_id).update(
+            {models.Usuario.senha_hash: novo_hash}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def criar_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+
+def _buscar_usuario(db: Session, email: str) -> Optional[models.Usuario]:
+    return db.query(models.Usuario).filter(models.Usuario.email == email).first()
+
+
+async def autenticar_usuario(db: Session, email: str, senha: str) -> Optional[models.Usuario]:
+    usuario = await run_in_threadpool(_buscar_usuario, db, email)
+    if not usuario or not usuario.ativo:
+        # Mesmo custo de uma senha errada: o tempo não revela quais emails existem
+        await senhas.verificar_ficticio(senha)
+        return None
+    if not await verificar_senha(senha, usuario.senha_hash):
+        return None
+    return usuario
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme),
+) -> Principal:
+    """
+    Resolve o usuário do token. O principal (id, email, role, ativo) fica
+    em cache por subject, evitando a consulta em `usuarios` a cada requisição.
+    """
+    cred_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Credenciais inválidas",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        email: str = payload.get("sub")
+        if email is None:
+            raise cred_exception
+    except JWTError:
+        raise cred_exception
+
+    principal = cache_principais.obter(email)
+    if principal is not None:
+        return principal
+
+    marca = cache_principais.marca(email)
+    usuario = db.query(models.Usuario).filter(models.Usuario.email == email).first()
+    if usuario is None or not usuario.ativo:
+        raise cred_exception
+    principal = Principal.de_usuario(usuario)
+    cache_principais.gravar(email, principal, marca)
+    return principal
+
+
+def exigir_role(*roles: models.RoleEnum):
+    def role_checker(usuario: Principal = Depends(get_current_user)):
+        if usuario.role not in roles:
+            raise HTTPException(status_code=403, detail="Sem permissão")
+        return usuario
+    return role_checker
@@ -0,0 +1,349 @@
+import logging
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, delete, event, insert, or_, select, text
+from sqlalchemy.engine import Connection
+
+from . import config, models
+
+logger = logging.getLogger(__name__)
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 100
+
+# Quantos candidatos buscar no índice por resultado pedido, antes do ranking final
+FATOR_CANDIDATOS = 5
+
+# (id, nome normalizado, cpf, telefone só com dígitos)
+Candidato = Tuple[int, str, str, str]
+
+
+# --------- Normalização e ranking ---------
+
+def normalizar(texto: Optional[str]) -> str:
+    """
+    Minúsculas, sem acentos e só com letras/dígitos separados por um espaço.
+    """
+    sem_acento = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", sem_acento.lower()).split())
+
+
+def somente_digitos(texto: Optional[str]) -> str:
+    return re.sub(r"\D", "", texto or "")
+
+
+class Termo:
+    """
+    Termo de busca já interpretado: texto (nome) ou dígitos (CPF/telefone).
+    """
+
+    def __init__(self, q: str):
+        self.texto = normalizar(q)
+        self.eh_numerico = not re.search(r"[a-z]", self.texto)
+        self.digitos = somente_digitos(q) if self.eh_numerico else ""
+        self.palavras = [] if self.eh_numerico else self.texto.split()
+
+
+def pontuar(termo: Termo, nome: str, cpf: str, telefone: str) -> int:
+    """
+    Ranking comum a todos os backends: CPF exato > prefixo de CPF > início do
+    nome > início de palavras do nome > telefone > trechos.
+    """
+    if termo.eh_numerico:
+        if cpf == termo.digitos:
+            return 100
+        if cpf.startswith(termo.digitos):
+            return 80
+        if telefone.endswith(termo.digitos) or telefone.startswith(termo.digitos):
+            return 60
+        return 30
+
+    if nome.startswith(termo.texto):
+        return 70
+    palavras = nome.split()
+    if all(any(p.startswith(t) for p in palavras) for t in termo.palavras):
+        return 50
+    return 20
+
+
+def _registro(id: int, nome: str, cpf: str, telefone: Optional[str], ativo: bool = True) -> dict:
+    return {
+        "id": id,
+        "nome": normalizar(nome),
+        "cpf": somente_digitos(cpf),
+        "telefone": somente_digitos(telefone),
+        "ativo": ativo,
+    }
+
+
+# --------- Backends ---------
+
+class IndiceBusca(ABC):
+    """
+    Interface dos índices de busca de pacientes. Só pacientes ativos ficam no índice.
+    """
+
+    @abstractmethod
+    def preparar(self, conn: Connection) -> None:
+        """
+        Cria as estruturas do índice se não existirem (e as popula nesse caso).
+        """
+
+    @abstractmethod
+    def remover(self, conn: Connection, ids: List[int]) -> None:
+        ...
+
+    @abstractmethod
+    def _inserir(self, conn: Connection, registros: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    def _consultar(self, conn: Connection, termo: Termo, limite: int, so_prefixos: bool) -> List[Candidato]:
+        """
+        Até `limite` casamentos do termo, em qualquer ordem. Com `so_prefixos`,
+        só os que começam pelo termo (CPF, nome ou alguma palavra do nome).
+        """
+
+    def candidatos(self, conn: Connection, termo: Termo, limite: int) -> List[Candidato]:
+        # Sem ORDER BY por relevância no banco (ordenar todos os casamentos de
+        # um termo comum custa caro); o ranking final é feito em pontuar().
+        # Primeiro os que começam pelo termo, depois o restante.
+        encontrados = {}
+        for so_prefixos in (True, False):
+            for candidato in self._consultar(conn, termo, limite - len(encontrados), so_prefixos):
+                encontrados.setdefault(candidato[0], candidato)
+            if len(encontrados) >= limite:
+                break
+        return list(encontrados.values())
+
+    def indexar(self, conn: Connection, registros: Iterable[dict]) -> None:
+        registros = list(registros)
+        if not registros:
+            return
+        self.remover(conn, [r["id"] for r in registros])
+        self._inserir(conn, [r for r in registros if r["ativo"]])
+
+    def reconstruir(self, conn: Connection) -> None:
+        pacientes = conn.execute(
+            select(
+                models.Paciente.id,
+                models.Paciente.nome,
+                models.Paciente.cpf,
+                models.Paciente.telefone,
+                models.Paciente.ativo,
+            ).where(models.Paciente.ativo.is_(True))
+        )
+        lote = []
+        for paciente in pacientes:
+            lote.append(_registro(*paciente))
+            if len(lote) >= 5000:
+                self._inserir(conn, lote)
+                lote = []
+        self._inserir(conn, lote)
+
+    def buscar(self, conn: Connection, q: str, limite: int) -> List[int]:
+        """
+        Ids dos pacientes ativos mais relevantes para `q`, em ordem de relevância.
+        """
+        termo = Termo(q)
+        if not termo.texto and not termo.digitos:
+            return []
+        candidatos = self.candidatos(conn, termo, limite * FATOR_CANDIDATOS)
+        ordenados = sorted(
+            candidatos,
+            key=lambda c: (-pontuar(termo, c[1], c[2], c[3]), c[1], c[0]),
+        )
+        return [c[0] for c in ordenados[:limite]]
+
+
+_metadata_busca = MetaData()
+
+pacientes_busca = Table(
+    "pacientes_busca",
+    _metadata_busca,
+    Column("paciente_id", Integer, primary_key=True),
+    Column("nome", String(120), nullable=False),
+    Column("cpf", String(11), nullable=False),
+    Column("telefone", String(20), nullable=False),
+)
+
+
+class IndiceNormalizado(IndiceBusca):
+    """
+    Tabela auxiliar com colunas normalizadas e busca por LIKE.
+    Funciona em qualquer banco; sem índices de trigramas, o LIKE '%x%' varre a tabela.
+    """
+
+    def preparar(self, conn: Connection) -> None:
+        if conn.dialect.has_table(conn, pacientes_busca.name):
+            return
+        pacientes_busca.create(conn)
+        self.reconstruir(conn)
+
+    def remover(self, conn: Connection, ids: List[int]) -> None:
+        conn.execute(delete(pacientes_busca).where(pacientes_busca.c.paciente_id.in_(ids)))
+
+    def _inserir(self, conn: Connection, registros: List[dict]) -> None:
+        if registros:
+            conn.execute(insert(pacientes_busca), [
+                {"paciente_id": r["id"], "nome": r["nome"], "cpf": r["cpf"], "telefone": r["telefone"]}
+                for r in registros
+            ])
+
+    def _consultar(self, conn: Connection, termo: Termo, limite: int, so_prefixos: bool) -> List[Candidato]:
+        t = pacientes_busca.c
+        if termo.eh_numerico:
+            filtros = [or_(t.cpf.like(f"%{termo.digitos}%"), t.telefone.like(f"%{termo.digitos}%"))]
+            if so_prefixos:
+                filtros.append(t.cpf.like(f"{termo.digitos}%"))
+        else:
+            filtros = [t.nome.like(f"%{p}%") for p in termo.palavras]
+            if so_prefixos:
+                filtros.append(or_(t.nome.like(f"{termo.texto}%"), t.nome.like(f"% {termo.texto}%")))
+        consulta = select(t.paciente_id, t.nome, t.cpf, t.telefone).where(*filtros).limit(limite)
+        return [tuple(linha) for linha in conn.execute(consulta)]
+
+
+class IndiceTrigramaPostgres(IndiceNormalizado):
+    """
+    Mesma tabela normalizada, com índices GIN de trigramas (pg_trgm),
+    que tornam indexados os LIKE de prefixo e de trecho.
+    """
+
+    def preparar(self, conn: Connection) -> None:
+        super().preparar(conn)
+        try:
+            with conn.begin_nested():
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                for coluna in ("nome", "cpf", "telefone"):
+                    conn.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS ix_pacientes_busca_{coluna}_trgm "
+                        f"ON pacientes_busca USING gin ({coluna} gin_trgm_ops)"
+                    ))
+        except Exception:
+            logger.warning("pg_trgm indisponível; busca de pacientes seguirá sem índice de trigramas")
+
+
+class IndiceFTSSQLite(IndiceBusca):
+    """
+    Tabela virtual FTS5 com tokenizador de trigramas (SQLite 3.34+), para
+    rodar a busca indexada localmente. Termos com menos de 3 caracteres
+    caem para LIKE sobre a própria tabela FTS.
+    """
+
+    TABELA = "pacientes_fts"
+
+    def preparar(self, conn: Connection) -> None:
+        existe = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :nome"), {"nome": self.TABELA}
+        ).first()
+        if existe:
+            return
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE {self.TABELA} USING fts5(nome, cpf, telefone, tokenize='trigram')"
+        ))
+        self.reconstruir(conn)
+
+    def remover(self, conn: Connection, ids: List[int]) -> None:
+        conn.execute(
+            text(f"DELETE FROM {self.TABELA} WHERE rowid = :id"),
+            [{"id": i} for i in ids],
+        )
+
+    def _inserir(self, conn: Connection, registros: List[dict]) -> None:
+        if registros:
+            conn.execute(
+                text(f"INSERT INTO {self.TABELA} (rowid, nome, cpf, telefone) VALUES (:id, :nome, :cpf, :telefone)"),
+                registros,
+            )
+
+    def _consultar(self, conn: Connection, termo: Termo, limite: int, so_prefixos: bool) -> List[Candidato]:
+        if termo.eh_numerico:
+            colunas, fragmentos = "{cpf telefone}", [termo.digitos]
+        else:
+            colunas, fragmentos = "nome", termo.palavras
+
+        expressoes, condicoes, params = [], [], {"limite": limite}
+        for i, fragmento in enumerate(fragmentos):
+            if len(fragmento) >= 3:
+                expressoes.append(f'{colunas} : "{fragmento}"')
+            else:
+                params[f"f{i}"] = f"%{fragmento}%"
+                if termo.eh_numerico:
+                    condicoes.append(f"(cpf LIKE :f{i} OR telefone LIKE :f{i})")
+                else:
+                    condicoes.append(f"nome LIKE :f{i}")
+        if expressoes:
+            params["match"] = " AND ".join(expressoes)
+            condicoes.insert(0, f"{self.TABELA} MATCH :match")
+        if so_prefixos:
+            if termo.eh_numerico:
+                params["prefixo"] = f"{termo.digitos}%"
+                condicoes.append("cpf LIKE :prefixo")
+            else:
+                params["prefixo"] = f"{termo.texto}%"
+                condicoes.append("(nome LIKE :prefixo OR nome LIKE '% ' || :prefixo)")
+
+        sql = (
+            f"SELECT rowid, nome, cpf, telefone FROM {self.TABELA} "
+            f"WHERE {' AND '.join(condicoes)} LIMIT :limite"
+        )
+        return [tuple(linha) for linha in conn.execute(text(sql), params)]
+
+
+BACKENDS = {
+    "normalizado": IndiceNormalizado,
+    "trigrama": IndiceTrigramaPostgres,
+    "fts": IndiceFTSSQLite,
+}
+
+
+def criar_indice(dialeto: str, nome: str = "auto") -> IndiceBusca:
+    if nome == "auto":
+        nome = {"postgresql": "trigrama", "sqlite": "fts"}.get(dialeto, "normalizado")
+    return BACKENDS[nome]()
+
+
+indice: Optional[IndiceBusca] = None
+
+
+def configurar_indice(novo: IndiceBusca) -> None:
+    global indice
+    indice = novo
+
+
+def preparar(engine) -> None:
+    """
+    Escolhe o backend conforme o banco (ou SGHSS_BUSCA_BACKEND) e cria o índice.
+    """
+    if indice is None:
+        configurar_indice(criar_indice(engine.dialect.name, config.BUSCA_BACKEND))
+    with engine.begin() as conn:
+        indice.preparar(conn)
+
+
+# --------- Atualização incremental ---------
+
+@event.listens_for(models.Paciente, "after_insert")
+@event.listens_for(models.Paciente, "after_update")
+def _indexar_paciente(mapper, connection, paciente):
+    """
+    Mantém o índice em dia na mesma transação de criação, atualização
+    ou inativação do paciente.
+    """
+    if indice is not None:
+        indice.indexar(connection, [
+            _registro(paciente.id, paciente.nome, paciente.cpf, paciente.telefone, paciente.ativo)
+        ])
+
+
+def indexar_em_lote(connection: Connection, pacientes: Iterable[dict]) -> None:
+    """
+    Para inserções em lote (insert() direto), que não disparam os eventos do ORM.
+    Cada dict traz id, nome, cpf, telefone e, opcionalmente, ativo.
+    """
+    if indice is not None:
+        indice.indexar(connection, [_registro(**p) for p in pacientes])
@@ -0,0 +1,335 @@
+import fnmatch
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from . import config, models
+
+
+# --------- Principal (usuário autenticado, sem sessão de banco) ---------
+
+class Principal(NamedTuple):
+    id: int
+    email: str
+    role: models.RoleEnum
+    ativo: bool
+
+    @classmethod
+    def de_usuario(cls, usuario: models.Usuario) -> "Principal":
+        return cls(id=usuario.id, email=usuario.email, role=usuario.role, ativo=usuario.ativo)
+
+
+# --------- Backends ---------
+
+# Validade da geração de uma chave no backend compartilhado (ver remover)
+TTL_GERACAO_SEGUNDOS = 3600
+
+
+class BackendCache(ABC):
+    """
+    Interface dos backends do cache de principals.
+
+    A geração de uma chave muda a cada remoção. Quem vai buscar o usuário
+    no banco lê a geração antes e a passa a gravar(): se ela mudou nesse
+    meio-tempo, a linha lida pode ser anterior à alteração e não é gravada.
+    """
+
+    @abstractmethod
+    def obter(self, chave: str) -> Optional[Principal]:
+        ...
+
+    @abstractmethod
+    def geracao(self, chave: str) -> int:
+        ...
+
+    @abstractmethod
+    def gravar(self, chave: str, principal: Principal, ttl: int, geracao: Optional[int] = None) -> None:
+        ...
+
+    @abstractmethod
+    def remover(self, chave: str) -> None:
+        ...
+
+    @abstractmethod
+    def limpar(self) -> None:
+        ...
+
+
+class BackendMemoria(BackendCache):
+    """
+    Cache em processo, LRU com expiração por TTL. Padrão para um único worker.
+    """
+
+    def __init__(self, max_itens: int = config.PRINCIPAL_CACHE_MAX_ITENS):
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Em processo basta uma geração para todas as chaves
+        self._geracao = 0
+
+    def obter(self, chave: str) -> Optional[Principal]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            principal, expira_em = item
+            if expira_em <= time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return principal
+
+    def geracao(self, chave: str) -> int:
+        with self._lock:
+            return self._geracao
+
+    def gravar(self, chave: str, principal: Principal, ttl: int, geracao: Optional[int] = None) -> None:
+        with self._lock:
+            if geracao is not None and geracao != self._geracao:
+                return
+            self._itens[chave] = (principal, time.monotonic() + ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def remover(self, chave: str) -> None:
+        with self._lock:
+            self._geracao += 1
+            self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+
+class BackendCompartilhado(BackendCache):
+    """
+    Cache compartilhado entre workers, sobre um cliente chave-valor com a
+    API get/setex/delete/incr/expire/scan_iter (ex.: redis-py).
+    A geração de cada chave fica no próprio servidor, visível a todos os
+    workers.
+    """
+
+    def __init__(
+        self,
+        cliente,
+        prefixo: str = "sghss:principal:",
+        prefixo_geracao: str = "sghss:principal-geracao:",
+    ):
+        self.cliente = cliente
+        self.prefixo = prefixo
+        self.prefixo_geracao = prefixo_geracao
+
+    def obter(self, chave: str) -> Optional[Principal]:
+        bruto = self.cliente.get(self.prefixo + chave)
+        if bruto is None:
+            return None
+        id_, email, role, ativo = json.loads(bruto)
+        return Principal(id=id_, email=email, role=models.RoleEnum(role), ativo=ativo)
+
+    def geracao(self, chave: str) -> int:
+        bruto = self.cliente.get(self.prefixo_geracao + chave)
+        return int(bruto) if bruto is not None else 0
+
+    def gravar(self, chave: str, principal: Principal, ttl: int, geracao: Optional[int] = None) -> None:
+        if geracao is not None and self.geracao(chave) != geracao:
+            return
+        bruto = json.dumps([principal.id, principal.email, principal.role.value, principal.ativo])
+        self.cliente.setex(self.prefixo + chave, ttl, bruto)
+        # Sem transação entre a conferência e o setex: uma remoção nesse
+        # intervalo já incrementou a geração, então a gravação é desfeita
+        if geracao is not None and self.geracao(chave) != geracao:
+            self.cliente.delete(self.prefixo + chave)
+
+    def remover(self, chave: str) -> None:
+        # Incrementa antes de apagar (ver gravar); a geração expira sozinha,
+        # bem depois de qualquer leitura em andamento ter terminado
+        self.cliente.incr(self.prefixo_geracao + chave)
+        self.cliente.expire(self.prefixo_geracao + chave, TTL_GERACAO_SEGUNDOS)
+        self.cliente.delete(self.prefixo + chave)
+
+    def limpar(self) -> None:
+        for chave in list(self.cliente.scan_iter(match=self.prefixo + "*")):
+            self.cliente.delete(chave)
+
+
+class ClienteChaveValorLocal:
+    """
+    Substituto local de um servidor chave-valor (mesma API usada pelo
+    BackendCompartilhado), para desenvolvimento e testes.
+    """
+
+    def __init__(self):
+        self._dados = {}
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            valor, expira_em = item
+            if expira_em <= time.monotonic():
+                del self._dados[chave]
+                return None
+            return valor
+
+    def setex(self, chave, ttl, valor):
+        with self._lock:
+            self._dados[chave] = (valor, time.monotonic() + ttl)
+
+    def incr(self, chave):
+        with self._lock:
+            valor, expira_em = self._dados.get(chave, (b"0", float("inf")))
+            if expira_em <= time.monotonic():
+                valor, expira_em = b"0", float("inf")
+            novo = int(valor) + 1
+            self._dados[chave] = (str(novo).encode(), expira_em)
+            return novo
+
+    def expire(self, chave, ttl):
+        with self._lock:
+            if chave in self._dados:
+                self._dados[chave] = (self._dados[chave][0], time.monotonic() + ttl)
+
+    def delete(self, *chaves):
+        with self._lock:
+            for chave in chaves:
+                self._dados.pop(chave, None)
+
+    def scan_iter(self, match="*"):
+        with self._lock:
+            chaves = list(self._dados)
+        return (c for c in chaves if fnmatch.fnmatchcase(c, match))
+
+
+# --------- Cache de principals ---------
+
+class CachePrincipais:
+    """
+    Cache de principals por subject do token (email), com contadores de
+    acertos/faltas e invalidação explícita.
+    """
+
+    def __init__(self, backend: BackendCache, ttl: int = config.PRINCIPAL_CACHE_TTL_SEGUNDOS):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidacoes = 0
+
+    def obter(self, email: str) -> Optional[Principal]:
+        principal = self.backend.obter(email)
+        with self._lock:
+            if principal is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return principal
+
+    def marca(self, email: str) -> int:
+        """
+        Marca a ser lida antes de buscar o usuário no banco e passada a gravar().
+        """
+        return self.backend.geracao(email)
+
+    def gravar(self, email: str, principal: Principal, marca: Optional[int] = None) -> None:
+        """
+        Com `marca`, não grava se o email foi invalidado depois dela (em
+        qualquer worker, no backend compartilhado): a linha lida do banco
+        pode ser anterior ao commit que motivou a invalidação.
+        """
+        self.backend.gravar(email, principal, self.ttl, marca)
+
+    def invalidar(self, email: str) -> None:
+        with self._lock:
+            self.invalidacoes += 1
+        self.backend.remover(email)
+
+    def limpar(self) -> None:
+        self.backend.limpar()
+
+    def configurar_backend(self, backend: BackendCache) -> None:
+        self.backend = backend
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidacoes": self.invalidacoes,
+            }
+
+
+def criar_backend(nome: str = config.PRINCIPAL_CACHE_BACKEND) -> BackendCache:
+    """
+    memoria: LRU em processo. compartilhado: servidor chave-valor em
+    SGHSS_PRINCIPAL_CACHE_URL (redis://...; requer o pacote redis) ou, com
+    "local", o ClienteChaveValorLocal.
+    """
+    if nome == "memoria":
+        return BackendMemoria()
+    if nome == "compartilhado":
+        url = config.PRINCIPAL_CACHE_URL
+        if url == "local":
+            return BackendCompartilhado(ClienteChaveValorLocal())
+        import redis
+
+        return BackendCompartilhado(redis.Redis.from_url(url))
+    raise ValueError(f"Backend de cache desconhecido: {nome}")
+
+
+cache_principais = CachePrincipais(criar_backend())
+
+
+# --------- Invalidação automática ---------
+# Os eventos de mapper rodam no flush, antes do commit: uma requisição que
+# lesse o banco nesse intervalo ainda veria a linha antiga e a gravaria no
+# cache. Por isso só se anotam os emails na sessão e a invalidação acontece
+# no after_commit (e é descartada em rollback).
+
+_CHAVE_SESSAO = "principais_a_invalidar"
+
+
+def _anotar(usuario, emails):
+    sessao = object_session(usuario)
+    if sessao is None:
+        for email in emails:
+            cache_principais.invalidar(email)
+        return
+    sessao.info.setdefault(_CHAVE_SESSAO, set()).update(emails)
+
+
+@event.listens_for(models.Usuario, "after_update")
+def _invalidar_usuario_alterado(mapper, connection, usuario):
+    """
+    Invalida o principal quando role, ativo ou email mudam,
+    qualquer que seja a rota ou script que fez a alteração.
+    """
+    estado = inspect(usuario)
+    if not any(estado.attrs[a].history.has_changes() for a in ("role", "ativo", "email")):
+        return
+    _anotar(usuario, [*(estado.attrs.email.history.deleted or ()), usuario.email])
+
+
+@event.listens_for(models.Usuario, "after_delete")
+def _invalidar_usuario_removido(mapper, connection, usuario):
+    _anotar(usuario, [usuario.email])
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_apos_commit(sessao):
+    for email in sessao.info.pop(_CHAVE_SESSAO, ()):
+        cache_principais.invalidar(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_apos_rollback(sessao):
+    sessao.info.pop(_CHAVE_SESSAO, None)
@@ -0,0 +1,42 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, declarative_base
+
+from . import config
+
+
+def _criar_engine(url: str):
+    """
+    Cria a engine com as opções de config.py.
+    SQLite (uso local/benchmarks) não aceita as opções de pool do QueuePool
+    da mesma forma, e precisa liberar o uso da conexão entre threads.
+    """
+    opcoes = {
+        "echo": config.DB_ECHO,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+    }
+    if url.startswith("sqlite"):
+        opcoes["connect_args"] = {"check_same_thread": False}
+    else:
+        opcoes["pool_size"] = config.DB_POOL_SIZE
+        opcoes["max_overflow"] = config.DB_MAX_OVERFLOW
+    return create_engine(url, **opcoes)
+
+
+engine = _criar_engine(config.DATABASE_URL)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base = declarative_base()
+
+
+def get_db():
+    """
+    Dependency para FastAPI injetar a sessão de banco em cada requisição.
+    Fecha a sessão automaticamente no final.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,423 @@
+import csv
+import json
+import tempfile
+from collections import defaultdict, deque
+from datetime import timedelta
+from typing import AsyncIterator, Callable, Deque, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from . import busca, models, relatorios, schemas
+from .agenda import consultas_agendadas, fim_da_consulta, travar_profissionais
+
+TAMANHO_LOTE_PADRAO = 500
+TAMANHO_LOTE_MAXIMO = 5000
+
+CRIADO = "criado"
+DUPLICADO = "duplicado"
+INVALIDO = "invalido"
+REVERTIDO = "revertido"
+
+# Modo atômico: corpo guardado antes do processamento (em disco acima disso)
+TAMANHO_CORPO_EM_MEMORIA = 8 * 1024 * 1024
+TAMANHO_BLOCO_LEITURA = 64 * 1024
+
+# (número da linha, registro lido, erro de leitura)
+Registro = Tuple[int, Optional[dict], Optional[str]]
+
+
+# --------- Leitura do corpo (NDJSON ou CSV) ---------
+
+class _LinhasRecebidas:
+    """
+    Fonte do csv.reader: as linhas do corpo já recebidas. Só recebe
+    registros completos, então o leitor nunca chega ao fim dela no meio
+    de um campo entre aspas.
+    """
+
+    def __init__(self):
+        self.linhas: Deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.linhas:
+            raise StopIteration
+        return self.linhas.popleft()
+
+
+def _interpretar_json(texto: str) -> Tuple[Optional[dict], Optional[str]]:
+    try:
+        registro = json.loads(texto)
+    except ValueError:
+        return None, "JSON inválido"
+    if not isinstance(registro, dict):
+        return None, "Esperado um objeto JSON"
+    return registro, None
+
+
+async def corpo_em_arquivo(request: Request) -> AsyncIterator[bytes]:
+    """
+    Recebe o corpo inteiro num arquivo temporário (em memória até
+    TAMANHO_CORPO_EM_MEMORIA) e só então o devolve em blocos. Usado no modo
+    atômico, cuja transação dura a importação toda: assim ela não fica
+    aberta, com profissionais travados, esperando um upload lento.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=TAMANHO_CORPO_EM_MEMORIA) as arquivo:
+        async for bloco in request.stream():
+            arquivo.write(bloco)
+        arquivo.seek(0)
+        while True:
+            bloco = arquivo.read(TAMANHO_BLOCO_LEITURA)
+            if not bloco:
+                return
+            yield bloco
+
+
+async def _linhas(blocos: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    resto = b""
+    async for bloco in blocos:
+        resto += bloco
+        *linhas, resto = resto.split(b"\n")
+        for bruta in linhas:
+            yield bruta
+    if resto:
+        yield resto
+
+
+async def ler_registros(
+    request: Request, blocos: Optional[AsyncIterator[bytes]] = None
+) -> AsyncIterator[Registro]:
+    """
+    Lê o corpo em streaming (ou de `blocos`, se informado), linha a linha,
+    sem carregá-lo inteiro na memória.
+    `Content-Type: text/csv` é lido como CSV com cabeçalho; o resto, como NDJSON.
+    No CSV, um campo entre aspas pode conter quebras de linha.
+    """
+    eh_csv = "text/csv" in request.headers.get("content-type", "")
+    numero = 0
+    # CSV: um único leitor para o corpo todo; as linhas de um registro
+    # ficam em `pendente` até as aspas abertas nele fecharem
+    recebidas = _LinhasRecebidas()
+    leitor = csv.reader(recebidas, strict=True)
+    cabecalho: Optional[List[str]] = None
+    pendente = ""
+
+    def registros_csv():
+        nonlocal cabecalho
+        while True:
+            try:
+                valores = next(leitor)
+            except StopIteration:
+                return
+            except csv.Error:
+                yield None, "CSV inválido (aspas não fechadas?)"
+                continue
+            if not valores:
+                continue
+            if cabecalho is None:
+                cabecalho = [v.strip() for v in valores]
+                continue
+            if len(valores) != len(cabecalho):
+                yield None, "Quantidade de colunas diferente do cabeçalho"
+                continue
+            yield {c: (v if v != "" else None) for c, v in zip(cabecalho, valores)}, None
+
+    async for bruta in _linhas(blocos if blocos is not None else request.stream()):
+        try:
+            texto = bruta.decode("utf-8")
+        except UnicodeDecodeError:
+            pendente = ""
+            numero += 1
+            yield numero, None, "Linha não está em UTF-8"
+            continue
+        if not eh_csv:
+            if texto.strip():
+                numero += 1
+                yield (numero, *_interpretar_json(texto))
+            continue
+
+        if not pendente and not texto.strip():
+            continue
+        pendente += texto + "\n"
+        if pendente.count('"') % 2:
+            continue
+        recebidas.linhas.append(pendente)
+        pendente = ""
+        for registro, erro in registros_csv():
+            numero += 1
+            yield numero, registro, erro
+
+    if pendente:
+        recebidas.linhas.append(pendente)
+        for registro, erro in registros_csv():
+            numero += 1
+            yield numero, registro, erro
+
+
+def _mensagem_validacao(erro: ValidationError) -> str:
+    detalhe = erro.errors()[0]
+    campo = ".".join(str(p) for p in detalhe["loc"])
+    return f"{campo}: {detalhe['msg']}" if campo else detalhe["msg"]
+
+
+def _validar(lote: List[Registro], schema, resultados: dict) -> list:
+    validos = []
+    for numero, registro, erro in lote:
+        if erro is not None:
+            resultados[numero] = {"linha": numero, "status": INVALIDO, "erro": erro}
+            continue
+        try:
+            validos.append((numero, schema.model_validate(registro)))
+        except ValidationError as e:
+            resultados[numero] = {"linha": numero, "status": INVALIDO, "erro": _mensagem_validacao(e)}
+    return validos
+
+
+def _garantir_transacao(db: Session) -> None:
+    """
+    O pysqlite só abre a transação no primeiro INSERT/UPDATE/DELETE; um
+    SAVEPOINT antes disso viraria a própria transação (e o RELEASE dele,
+    um commit). Nesse caso abre a transação explicitamente.
+    """
+    conexao = db.connection()
+    if conexao.dialect.name == "sqlite" and not conexao.connection.dbapi_connection.in_transaction:
+        conexao.exec_driver_sql("BEGIN")
+
+
+def _mensagem_banco(erro: DBAPIError) -> str:
+    # Primeira linha da mensagem do driver, p.ex. "UNIQUE constraint failed: pacientes.cpf"
+    linhas = str(erro.orig).strip().splitlines()
+    return f"Recusado pelo banco: {linhas[0] if linhas else type(erro.orig).__name__}"
+
+
+def _inserir_linha_a_linha(db: Session, modelo, novos: list, resultados: dict) -> Tuple[list, List[int]]:
+    inseridos, ids = [], []
+    for numero, dados in novos:
+        try:
+            with db.begin_nested():
+                novo_id = db.execute(
+                    insert(modelo).returning(modelo.id), dados.model_dump()
+                ).scalar_one()
+        except DBAPIError as e:
+            resultados[numero] = {"linha": numero, "status": INVALIDO, "erro": _mensagem_banco(e)}
+            continue
+        inseridos.append((numero, dados))
+        ids.append(novo_id)
+    return inseridos, ids
+
+
+def _inserir(
+    db: Session,
+    modelo,
+    novos: list,
+    resultados: dict,
+    atomico: bool,
+    depois: Optional[Callable[[Session, list, List[int]], None]] = None,
+):
+    """
+    Insere o lote com um único INSERT multi-linha (executemany + RETURNING).
+    Se o banco recusar o lote (p.ex. um CPF gravado por outra requisição
+    depois da verificação), refaz linha a linha, cada uma num savepoint,
+    para reportar só as linhas recusadas.
+    `depois(db, novos, ids)` roda na mesma transação, antes do commit.
+    """
+    if not novos:
+        return
+    _garantir_transacao(db)
+    try:
+        with db.begin_nested():
+            ids = db.execute(
+                insert(modelo).returning(modelo.id, sort_by_parameter_order=True),
+                [dados.model_dump() for _, dados in novos],
+            ).scalars().all()
+    except DBAPIError:
+        novos, ids = _inserir_linha_a_linha(db, modelo, novos, resultados)
+    if not novos:
+        return
+    try:
+        if depois is not None:
+            depois(db, novos, ids)
+        if not atomico:
+            db.commit()
+    except DBAPIError:
+        db.rollback()
+        for numero, _ in novos:
+            resultados[numero] = {"linha": numero, "status": INVALIDO, "erro": "Lote recusado pelo banco"}
+        return
+    for (numero, _), novo_id in zip(novos, ids):
+        resultados[numero] = {"linha": numero, "status": CRIADO, "id": novo_id}
+
+
+# --------- Lotes por domínio ---------
+
+def _indexar_pacientes(db: Session, novos: list, ids: List[int]):
+    busca.indexar_em_lote(db.connection(), [
+        {"id": novo_id, "nome": p.nome, "cpf": p.cpf, "telefone": p.telefone}
+        for (_, p), novo_id in zip(novos, ids)
+    ])
+
+
+def processar_lote_pacientes(db: Session, lote: List[Registro], atomico: bool) -> List[dict]:
+    """
+    Valida o lote, verifica CPFs já cadastrados com um único SELECT ... IN
+    e insere os novos de uma vez.
+    """
+    resultados: dict = {}
+    validos = _validar(lote, schemas.PacienteCreate, resultados)
+
+    cpfs = {p.cpf for _, p in validos}
+    existentes = {
+        cpf for (cpf,) in db.query(models.Paciente.cpf).filter(models.Paciente.cpf.in_(cpfs))
+    } if cpfs else set()
+
+    novos = []
+    for numero, paciente in validos:
+        if paciente.cpf in existentes:
+            resultados[numero] = {"linha": numero, "status": DUPLICADO, "erro": "CPF já cadastrado"}
+            continue
+        existentes.add(paciente.cpf)
+        novos.append((numero, paciente))
+
+    _inserir(db, models.Paciente, novos, resultados, atomico, depois=_indexar_pacientes)
+    return [resultados[n] for n in sorted(resultados)]
+
+
+def _contar_consultas(db: Session, novos: list, ids: List[int]):
+    relatorios.contar_novas(db, [c for _, c in novos])
+
+
+def processar_lote_consultas(db: Session, lote: List[Registro], atomico: bool) -> List[dict]:
+    """
+    Valida o lote, confere pacientes/profissionais ativos e conflitos de
+    horário com consultas set-based e insere as consultas válidas de uma vez.
+    """
+    resultados: dict = {}
+    validos = _validar(lote, schemas.ConsultaCreate, resultados)
+    if not validos:
+        return [resultados[n] for n in sorted(resultados)]
+
+    paciente_ids = {c.paciente_id for _, c in validos}
+    profissional_ids = {c.profissional_id for _, c in validos}
+    pacientes_ativos = {
+        pid for (pid,) in db.query(models.Paciente.id).filter(
+            models.Paciente.id.in_(paciente_ids), models.Paciente.ativo.is_(True)
+        )
+    }
+    # Trava os profissionais do lote, como em agendar_consulta
+    travar_profissionais(db, sorted(profissional_ids))
+    profissionais_ativos = {
+        pid for (pid,) in db.query(models.Profissional.id).filter(
+            models.Profissional.id.in_(profissional_ids), models.Profissional.ativo.is_(True)
+        )
+    }
+
+    inicio = min(c.data_hora for _, c in validos)
+    fim = max(c.data_hora + timedelta(minutes=c.duracao_minutos) for _, c in validos)
+    ocupados = defaultdict(list)
+    for consulta in consultas_agendadas(db, profissionais_ativos, inicio, fim):
+        ocupados[consulta.profissional_id].append((consulta.data_hora, fim_da_consulta(consulta)))
+
+    novos = []
+    for numero, consulta in validos:
+        if consulta.paciente_id not in pacientes_ativos:
+            resultados[numero] = {"linha": numero, "status": INVALIDO, "erro": "Paciente inválido"}
+            continue
+        if consulta.profissional_id not in profissionais_ativos:
+            resultados[numero] = {"linha": numero, "status": INVALIDO, "erro": "Profissional inválido"}
+            continue
+        c_inicio = consulta.data_hora
+        c_fim = c_inicio + timedelta(minutes=consulta.duracao_minutos)
+        intervalos = ocupados[consulta.profissional_id]
+        if any(o_inicio < c_fim and o_fim > c_inicio for o_inicio, o_fim in intervalos):
+            resultados[numero] = {
+                "linha": numero,
+                "status": DUPLICADO,
+                "erro": "Profissional já possui consulta nesse horário",
+            }
+            continue
+        intervalos.append((c_inicio, c_fim))
+        novos.append((numero, consulta))
+
+    _inserir(db, models.Consulta, novos, resultados, atomico, depois=_contar_consultas)
+    return [resultados[n] for n in sorted(resultados)]
+
+
+# --------- Orquestração ---------
+
+def _finalizar(db: Session, linhas: List[dict], atomico: bool) -> dict:
+    houve_falha = any(linha["status"] != CRIADO for linha in linhas)
+    confirmado = True
+    if atomico:
+        if houve_falha:
+            db.rollback()
+            confirmado = False
+            for linha in linhas:
+                if linha["status"] == CRIADO:
+                    linha["status"] = REVERTIDO
+                    linha["id"] = None
+        else:
+            db.commit()
+
+    return {
+        "criados": sum(1 for linha in linhas if linha["status"] == CRIADO),
+        "duplicados": sum(1 for linha in linhas if linha["status"] == DUPLICADO),
+        "invalidos": sum(1 for linha in linhas if linha["status"] == INVALIDO),
+        "confirmado": confirmado,
+        "linhas": linhas,
+    }
+
+
+def _processar(
+    db: Session,
+    processar_lote: Callable[[Session, List[Registro], bool], List[dict]],
+    lote: List[Registro],
+    atomico: bool,
+) -> List[dict]:
+    """
+    Fora do modo atômico, todo lote termina a sua transação, mesmo sem nada
+    a inserir: as travas (travar_profissionais) não ficam presas enquanto
+    o próximo trecho do corpo chega.
+    """
+    try:
+        linhas = processar_lote(db, lote, atomico)
+    except Exception:
+        db.rollback()
+        raise
+    if not atomico:
+        db.commit()
+    return linhas
+
+
+async def importar(
+    request: Request,
+    db: Session,
+    processar_lote: Callable[[Session, List[Registro], bool], List[dict]],
+    tamanho_lote: int,
+    atomico: bool,
+) -> dict:
+    """
+    Lê o corpo em streaming e processa em lotes de `tamanho_lote` linhas.
+    - atomico=True: tudo ou nada, um único commit no final. O corpo é
+      recebido por inteiro antes do primeiro lote (ver corpo_em_arquivo).
+    - atomico=False: commit por lote; linhas com problema são apenas reportadas.
+    O trabalho de banco roda no threadpool para não bloquear o event loop.
+    """
+    blocos = corpo_em_arquivo(request) if atomico else request.stream()
+    linhas: List[dict] = []
+    lote: List[Registro] = []
+    async for registro in ler_registros(request, blocos):
+        lote.append(registro)
+        if len(lote) >= tamanho_lote:
+            linhas += await run_in_threadpool(_processar, db, processar_lote, lote, atomico)
+            lote = []
+    if lote:
+        linhas += await run_in_threadpool(_processar, db, processar_lote, lote, atomico)
+
+    return await run_in_threadpool(_finalizar, db, linhas, atomico)
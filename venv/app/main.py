@@ -0,0 +1,115 @@
+from fastapi import BackgroundTasks, FastAPI, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.orm import Session
+
+from . import busca, config, models, relatorios, schemas, senhas
+from .database import engine, get_db
+from .auth import autenticar_usuario, criar_access_token, rehash_senha
+from .cache import cache_principais
+from .metricas import metricas, instrumentar
+from .routers import pacientes, profissionais, consultas, relatorios as relatorios_router
+
+# Cria as tabelas no banco na primeira subida
+models.Base.metadata.create_all(bind=engine)
+# Índice de busca de pacientes (populado a partir da tabela se ainda não existir)
+busca.preparar(engine)
+# Resumo da agenda (populado a partir das consultas se estiver vazio)
+relatorios.preparar(engine)
+
+app = FastAPI(title="SGHSS - VidaPlus")
+
+if config.METRICS_ENABLED:
+    instrumentar(app, engine, models.Base)
+
+
+@app.exception_handler(senhas.PoolSenhasSaturado)
+def pool_senhas_saturado(request: Request, exc: senhas.PoolSenhasSaturado):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Serviço de autenticação ocupado, tente novamente"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.on_event("shutdown")
+def encerrar_pool_senhas():
+    senhas.encerrar()
+
+
+# ---------- Rotas de autenticação ----------
+
+def _email_cadastrado(db: Session, email: str) -> bool:
+    return db.query(models.Usuario.id).filter(models.Usuario.email == email).first() is not None
+
+
+def _gravar_usuario(db: Session, usuario: models.Usuario) -> models.Usuario:
+    db.add(usuario)
+    db.commit()
+    db.refresh(usuario)
+    return usuario
+
+
+# Rotas async: o bcrypt roda no pool de processos e a espera não prende
+# thread; o acesso ao banco vai para o threadpool.
+
+@app.post("/auth/signup", response_model=schemas.UsuarioOut, tags=["auth"])
+async def signup(usuario_in: schemas.UsuarioCreate, db: Session = Depends(get_db)):
+    if await run_in_threadpool(_email_cadastrado, db, usuario_in.email):
+        raise HTTPException(status_code=400, detail="Email já cadastrado")
+
+    usuario = models.Usuario(
+        email=usuario_in.email,
+        senha_hash=await senhas.gerar_hash(usuario_in.senha),
+        role=usuario_in.role,
+        ativo=True,
+    )
+    return await run_in_threadpool(_gravar_usuario, db, usuario)
+
+
+@app.post("/auth/login", response_model=schemas.Token, tags=["auth"])
+async def login(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+):
+    usuario = await autenticar_usuario(db, form_data.username, form_data.password)
+    if not usuario:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email ou senha inválidos",
+        )
+    # Senha em texto puro ou com custo antigo: atualiza depois da resposta
+    if senhas.precisa_rehash(usuario.senha_hash):
+        background_tasks.add_task(rehash_senha, usuario.id, form_data.password)
+    access_token = criar_access_token(data={"sub": usuario.email})
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+# ---------- Routers de domínio ----------
+
+app.include_router(pacientes.router, prefix="/pacientes", tags=["pacientes"])
+app.include_router(profissionais.router, prefix="/profissionais", tags=["profissionais"])
+app.include_router(consultas.router, prefix="/consultas", tags=["consultas"])
+app.include_router(relatorios_router.router, prefix="/relatorios", tags=["relatorios"])
+
+
+# ---------- Métricas (formato Prometheus) ----------
+
+if config.METRICS_ENABLED:
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def exportar_metricas():
+        cache = cache_principais.estatisticas()
+        extras = [
+            "# HELP sghss_principal_cache_total Acessos ao cache de principals por resultado.",
+            "# TYPE sghss_principal_cache_total counter",
+            f'sghss_principal_cache_total{{resultado="hit"}} {cache["hits"]}',
+            f'sghss_principal_cache_total{{resultado="miss"}} {cache["misses"]}',
+            f'sghss_principal_cache_total{{resultado="invalidacao"}} {cache["invalidacoes"]}',
+        ]
+        return PlainTextResponse(
+            metricas.exportar(extras),
+            media_type="text/plain; version=0.0.4",
+        )
@@ -0,0 +1,291 @@
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_QUERIES = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+# Heurística de N+1: queries crescendo junto com as linhas carregadas
+N_MAIS_1_MIN_AMOSTRAS = 10
+N_MAIS_1_MIN_QUERIES = 5
+N_MAIS_1_INCLINACAO = 0.5
+
+ROTA_DESCONHECIDA = "<sem_rota>"
+
+
+class _Requisicao:
+    __slots__ = ("queries", "tempo_db", "linhas")
+
+    def __init__(self):
+        self.queries = 0
+        self.tempo_db = 0.0
+        self.linhas = 0
+
+
+# Contadores da requisição corrente. O objeto é mutável para que as threads do
+# threadpool (que recebem uma cópia do contexto) somem no mesmo lugar.
+_requisicao_atual: ContextVar[Optional[_Requisicao]] = ContextVar("requisicao_atual", default=None)
+
+
+# --------- Agregação ---------
+
+class _Histograma:
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        i = bisect.bisect_left(self.limites, valor)
+        if i < len(self.contagens):
+            self.contagens[i] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class _Regressao:
+    """
+    Mínimos quadrados incremental de queries (y) por linhas carregadas (x).
+    """
+    __slots__ = ("n", "sx", "sy", "sxx", "sxy", "max_queries")
+
+    def __init__(self):
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+        self.max_queries = 0
+
+    def adicionar(self, x: int, y: int):
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+        self.max_queries = max(self.max_queries, y)
+
+    def inclinacao(self) -> float:
+        denominador = self.n * self.sxx - self.sx * self.sx
+        if self.n < 2 or denominador == 0:
+            return 0.0
+        return (self.n * self.sxy - self.sx * self.sy) / denominador
+
+    def suspeita(self) -> bool:
+        return (
+            self.n >= N_MAIS_1_MIN_AMOSTRAS
+            and self.max_queries >= N_MAIS_1_MIN_QUERIES
+            and self.inclinacao() >= N_MAIS_1_INCLINACAO
+        )
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencia: Dict[Tuple[str, str], _Histograma] = {}
+        self.queries: Dict[Tuple[str, str], _Histograma] = {}
+        self.tempo_db: Dict[Tuple[str, str], float] = {}
+        self.respostas: Dict[Tuple[str, str, int], int] = {}
+        self.regressoes: Dict[Tuple[str, str], _Regressao] = {}
+        self._suspeitas_avisadas = set()
+
+    def registrar(self, metodo: str, rota: str, status: int, duracao: float, req: _Requisicao):
+        chave = (metodo, rota)
+        with self._lock:
+            if chave not in self.latencia:
+                self.latencia[chave] = _Histograma(BUCKETS_LATENCIA)
+                self.queries[chave] = _Histograma(BUCKETS_QUERIES)
+                self.tempo_db[chave] = 0.0
+                self.regressoes[chave] = _Regressao()
+            self.latencia[chave].observar(duracao)
+            self.queries[chave].observar(req.queries)
+            self.tempo_db[chave] += req.tempo_db
+            self.respostas[(metodo, rota, status)] = self.respostas.get((metodo, rota, status), 0) + 1
+
+            regressao = self.regressoes[chave]
+            regressao.adicionar(req.linhas, req.queries)
+            if regressao.suspeita() and chave not in self._suspeitas_avisadas:
+                self._suspeitas_avisadas.add(chave)
+                logger.warning(
+                    "Possível N+1 em %s %s: %.2f queries por linha carregada",
+                    metodo, rota, regressao.inclinacao(),
+                )
+
+    def limpar(self):
+        with self._lock:
+            self.latencia.clear()
+            self.queries.clear()
+            self.tempo_db.clear()
+            self.respostas.clear()
+            self.regressoes.clear()
+            self._suspeitas_avisadas.clear()
+
+    def exportar(self, extras: Optional[List[str]] = None) -> str:
+        """
+        Gera o texto no formato de exposição do Prometheus.
+        """
+        linhas: List[str] = []
+        with self._lock:
+            linhas += _exportar_histogramas(
+                "sghss_http_request_duration_seconds",
+                "Latência das requisições HTTP por rota.",
+                self.latencia,
+            )
+            linhas += _exportar_histogramas(
+                "sghss_db_queries_per_request",
+                "Quantidade de comandos SQL por requisição.",
+                self.queries,
+            )
+
+            linhas.append("# HELP sghss_db_time_seconds_total Tempo total gasto em SQL por rota.")
+            linhas.append("# TYPE sghss_db_time_seconds_total counter")
+            for (metodo, rota), total in sorted(self.tempo_db.items()):
+                linhas.append(f"sghss_db_time_seconds_total{_rotulos(metodo, rota)} {total:.6f}")
+
+            linhas.append("# HELP sghss_http_responses_total Respostas HTTP por rota e status.")
+            linhas.append("# TYPE sghss_http_responses_total counter")
+            for (metodo, rota, status), total in sorted(self.respostas.items()):
+                linhas.append(
+                    f"sghss_http_responses_total{_rotulos(metodo, rota, status=str(status))} {total}"
+                )
+
+            linhas.append(
+                "# HELP sghss_db_queries_per_loaded_row Inclinação de queries por linha carregada (N+1)."
+            )
+            linhas.append("# TYPE sghss_db_queries_per_loaded_row gauge")
+            for (metodo, rota), regressao in sorted(self.regressoes.items()):
+                linhas.append(
+                    f"sghss_db_queries_per_loaded_row{_rotulos(metodo, rota)} {regressao.inclinacao():.6f}"
+                )
+
+            linhas.append("# HELP sghss_n_plus_one_suspected Rota com padrão suspeito de N+1.")
+            linhas.append("# TYPE sghss_n_plus_one_suspected gauge")
+            for (metodo, rota), regressao in sorted(self.regressoes.items()):
+                linhas.append(
+                    f"sghss_n_plus_one_suspected{_rotulos(metodo, rota)} {int(regressao.suspeita())}"
+                )
+
+        linhas += extras or []
+        return "\n".join(linhas) + "\n"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos(metodo: str, rota: str, **extras: str) -> str:
+    pares = [("method", metodo), ("route", rota), *extras.items()]
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+
+def _exportar_histogramas(nome: str, ajuda: str, histogramas: dict) -> List[str]:
+    linhas = [f"# HELP {nome} {ajuda}", f"# TYPE {nome} histogram"]
+    for (metodo, rota), h in sorted(histogramas.items()):
+        acumulado = 0
+        for limite, contagem in zip(h.limites, h.contagens):
+            acumulado += contagem
+            linhas.append(f"{nome}_bucket{_rotulos(metodo, rota, le=str(limite))} {acumulado}")
+        linhas.append(f"{nome}_bucket{_rotulos(metodo, rota, le='+Inf')} {h.total}")
+        linhas.append(f"{nome}_sum{_rotulos(metodo, rota)} {h.soma:.6f}")
+        linhas.append(f"{nome}_count{_rotulos(metodo, rota)} {h.total}")
+    return linhas
+
+
+metricas = Metricas()
+
+
+# --------- Middleware ASGI ---------
+
+class MetricasMiddleware:
+    """
+    Mede a latência até o último byte do corpo (inclusive respostas em
+    streaming) e agrega os contadores de SQL da requisição.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        req = _Requisicao()
+        token = _requisicao_atual.set(req)
+        inicio = time.perf_counter()
+        status_http = 500
+        registrado = False
+
+        def registrar():
+            nonlocal registrado
+            if registrado:
+                return
+            registrado = True
+            rota = scope.get("route")
+            metricas.registrar(
+                scope["method"],
+                rota.path if rota is not None else ROTA_DESCONHECIDA,
+                status_http,
+                time.perf_counter() - inicio,
+                req,
+            )
+
+        async def send_medido(mensagem):
+            nonlocal status_http
+            if mensagem["type"] == "http.response.start":
+                status_http = mensagem["status"]
+            await send(mensagem)
+            if mensagem["type"] == "http.response.body" and not mensagem.get("more_body", False):
+                registrar()
+
+        try:
+            await self.app(scope, receive, send_medido)
+        finally:
+            registrar()
+            _requisicao_atual.reset(token)
+
+
+# --------- Hooks do SQLAlchemy ---------
+
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info["metricas_inicio"].pop()
+    req = _requisicao_atual.get()
+    if req is not None:
+        req.queries += 1
+        req.tempo_db += time.perf_counter() - inicio
+
+
+def _erro_no_comando(contexto):
+    if contexto.connection is not None:
+        pendentes = contexto.connection.info.get("metricas_inicio")
+        if pendentes:
+            pendentes.pop()
+
+
+def _instancia_carregada(alvo, contexto):
+    req = _requisicao_atual.get()
+    if req is not None:
+        req.linhas += 1
+
+
+def instrumentar(app, engine, base):
+    """
+    Registra o middleware e os hooks de SQL/ORM. Só é chamado quando as
+    métricas estão habilitadas, então desligadas não há custo algum.
+    """
+    event.listen(engine, "before_cursor_execute", _antes_do_comando)
+    event.listen(engine, "after_cursor_execute", _depois_do_comando)
+    event.listen(engine, "handle_error", _erro_no_comando)
+    event.listen(base, "load", _instancia_carregada, propagate=True)
+    app.add_middleware(MetricasMiddleware)
@@ -0,0 +1,116 @@
+from datetime import datetime, date
+
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.orm import relationship
+
+from .database import Base
+import enum
+
+
+# --------- Enums de papéis e status ---------
+
+class RoleEnum(str, enum.Enum):
+    ADMIN = "ADMIN"
+    MEDICO = "MEDICO"
+    ATENDENTE = "ATENDENTE"
+    PACIENTE = "PACIENTE"
+
+
+class StatusConsultaEnum(str, enum.Enum):
+    AGENDADA = "AGENDADA"
+    CANCELADA = "CANCELADA"
+    REALIZADA = "REALIZADA"
+
+
+# --------- Usuário (Autenticação / Autorização) ---------
+
+class Usuario(Base):
+    __tablename__ = "usuarios"
+
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String(120), unique=True, nullable=False, index=True)
+    senha_hash = Column(String(255), nullable=False)
+    role = Column(Enum(RoleEnum), nullable=False)
+    ativo = Column(Boolean, default=True, nullable=False)
+
+
+# --------- Paciente ---------
+
+class Paciente(Base):
+    __tablename__ = "pacientes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    nome = Column(String(120), nullable=False)
+    cpf = Column(String(11), unique=True, nullable=False, index=True)
+    data_nascimento = Column(Date, nullable=True)
+    telefone = Column(String(20), nullable=True)
+    email = Column(String(120), nullable=True)
+    endereco = Column(String(255), nullable=True)
+    dados_clinicos_resumidos = Column(String(500), nullable=True)
+    ativo = Column(Boolean, default=True, nullable=False)
+
+    consultas = relationship("Consulta", back_populates="paciente")
+
+
+# --------- Profissional de Saúde ---------
+
+class Profissional(Base):
+    __tablename__ = "profissionais"
+
+    id = Column(Integer, primary_key=True, index=True)
+    nome = Column(String(120), nullable=False)
+    documento_registro = Column(String(30), nullable=False)  # CRM, COREN, etc.
+    especialidade = Column(String(120), nullable=True)
+    email = Column(String(120), nullable=True)
+    telefone = Column(String(20), nullable=True)
+    ativo = Column(Boolean, default=True, nullable=False)
+
+    consultas = relationship("Consulta", back_populates="profissional")
+
+
+# --------- Consulta ---------
+
+class Consulta(Base):
+    __tablename__ = "consultas"
+
+    id = Column(Integer, primary_key=True, index=True)
+    paciente_id = Column(Integer, ForeignKey("pacientes.id"), nullable=False)
+    profissional_id = Column(Integer, ForeignKey("profissionais.id"), nullable=False)
+    data_hora = Column(DateTime, nullable=False)
+    duracao_minutos = Column(Integer, default=30, nullable=False)
+    status = Column(Enum(StatusConsultaEnum),
+                    default=StatusConsultaEnum.AGENDADA,
+                    nullable=False)
+    observacoes = Column(String(500), nullable=True)
+    criado_em = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    paciente = relationship("Paciente", back_populates="consultas")
+    profissional = relationship("Profissional", back_populates="consultas")
+
+    __table_args__ = (
+        # Ordem/keyset da listagem de consultas
+        Index("ix_consultas_data_hora_id", "data_hora", "id"),
+        # Detecção de conflito e disponibilidade por profissional
+        Index("ix_consultas_profissional_data_hora_status", "profissional_id", "data_hora", "status"),
+    )
+
+
+# --------- Resumo da agenda (relatórios) ---------
+
+class ResumoAgenda(Base):
+    """
+    Quantidade de consultas por profissional, dia (de data_hora) e status.
+    Mantido incrementalmente no agendamento/cancelamento; reconstruível a
+    partir de `consultas` com `python -m app.relatorios`.
+    """
+    __tablename__ = "resumo_agenda"
+
+    profissional_id = Column(Integer, ForeignKey("profissionais.id"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    status = Column(Enum(StatusConsultaEnum), primary_key=True)
+    quantidade = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        # Relatórios de todos os profissionais num período
+        Index("ix_resumo_agenda_dia", "dia"),
+    )
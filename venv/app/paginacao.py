@@ -0,0 +1,123 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+from . import database
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 1000
+
+# Quantidade de linhas buscadas por vez do cursor do servidor no modo NDJSON
+TAMANHO_LOTE_STREAM = 500
+
+
+# --------- Cursor opaco ---------
+
+def codificar_cursor(valores: Sequence) -> str:
+    """
+    Codifica os valores da chave da última linha da página em um cursor opaco.
+    """
+    serializados = [v.isoformat() if isinstance(v, datetime) else v for v in valores]
+    bruto = json.dumps(serializados, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def _converter(coluna, valor):
+    """
+    Converte o valor do cursor para o tipo Python da coluna; ValueError se não bater.
+    """
+    tipo = coluna.type.python_type
+    if tipo is datetime:
+        if not isinstance(valor, str):
+            raise ValueError
+        return datetime.fromisoformat(valor)
+    # bool é subclasse de int no Python, mas não é um id válido
+    if isinstance(valor, bool) or not isinstance(valor, tipo):
+        raise ValueError
+    return valor
+
+
+def decodificar_cursor(cursor: str, chaves: Sequence) -> list:
+    """
+    Decodifica um cursor recebido do cliente, validando/convertendo cada
+    valor de acordo com o tipo da coluna correspondente.
+    """
+    try:
+        preenchido = cursor + "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(preenchido.encode()))
+        if not isinstance(valores, list) or len(valores) != len(chaves):
+            raise ValueError
+        return [_converter(col, v) for col, v in zip(chaves, valores)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+# --------- Keyset ---------
+
+def aplicar_cursor(query: Query, chaves: Sequence, cursor: Optional[str]) -> Query:
+    """
+    Restringe a query às linhas posteriores ao cursor, na ordem das chaves.
+    Usa (a > x) OR (a = x AND b > y) para funcionar em qualquer banco.
+    """
+    if not cursor:
+        return query
+    valores = decodificar_cursor(cursor, chaves)
+
+    condicoes = []
+    for i, (col, valor) in enumerate(zip(chaves, valores)):
+        anteriores = [c == v for c, v in zip(chaves[:i], valores[:i])]
+        condicoes.append(and_(*anteriores, col > valor))
+    return query.filter(or_(*condicoes))
+
+
+def paginar(query: Query, chaves: Sequence, limite: int) -> dict:
+    """
+    Busca uma página (limite + 1 linhas para saber se há próxima)
+    e devolve os itens junto com o cursor `next`.
+    """
+    linhas = query.order_by(*chaves).limit(limite + 1).all()
+    proximo = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        ultima = linhas[-1]
+        proximo = codificar_cursor([getattr(ultima, col.key) for col in chaves])
+    return {"itens": linhas, "next": proximo}
+
+
+# --------- Streaming NDJSON ---------
+
+def aceita_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def stream_ndjson(query: Query, chaves: Sequence, schema) -> StreamingResponse:
+    """
+    Devolve todas as linhas da query como NDJSON, lendo de um cursor
+    do servidor em lotes para manter a memória constante.
+    Usa uma sessão própria, pois o corpo é gerado depois que a rota retorna.
+    """
+    query = query.order_by(*chaves).yield_per(TAMANHO_LOTE_STREAM)
+
+    def gerar():
+        db = database.SessionLocal()
+        try:
+            lote = []
+            for obj in query.with_session(db):
+                lote.append(schema.model_validate(obj).model_dump_json())
+                if len(lote) >= TAMANHO_LOTE_STREAM:
+                    yield "\n".join(lote) + "\n"
+                    lote = []
+            if lote:
+                yield "\n".join(lote) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(gerar(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,255 @@
+"""
+Resumo da agenda (profissional × dia × status) e relatórios sobre ele.
+
+Reconstrução (backfill), para todo o histórico ou um período:
+    python -m app.relatorios
+    python -m app.relatorios --de 2024-01-01 --ate 2024-12-31
+"""
+import argparse
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, false, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import models
+
+PERIODO_MAXIMO_RELATORIO = timedelta(days=366)
+
+CAMPOS_STATUS = {
+    models.StatusConsultaEnum.AGENDADA: "agendadas",
+    models.StatusConsultaEnum.CANCELADA: "canceladas",
+    models.StatusConsultaEnum.REALIZADA: "realizadas",
+}
+
+_resumo = models.ResumoAgenda.__table__
+_CHAVE = ["profissional_id", "dia", "status"]
+_INSERT_COM_UPSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+# Chave do advisory lock que serializa a reconstrução na subida (PostgreSQL)
+TRAVA_PREPARAR = 0x5E5A6E4441
+
+
+# --------- Atualização incremental ---------
+
+def _aplicar(conn: Connection, variacoes: Counter):
+    """
+    Soma as variações de quantidade em cada (profissional, dia, status),
+    criando a linha se preciso. Em ordem de chave, para que transações
+    concorrentes travem as linhas sempre na mesma sequência.
+    """
+    linhas = [
+        {"profissional_id": pid, "dia": dia, "status": status, "quantidade": quantidade}
+        for (pid, dia, status), quantidade in sorted(variacoes.items())
+        if quantidade
+    ]
+    if not linhas:
+        return
+
+    insert_upsert = _INSERT_COM_UPSERT.get(conn.dialect.name)
+    if insert_upsert is not None:
+        stmt = insert_upsert(_resumo)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=_CHAVE,
+            set_={"quantidade": _resumo.c.quantidade + stmt.excluded.quantidade},
+        )
+        conn.execute(stmt, linhas)
+        return
+
+    for linha in linhas:
+        atualizadas = conn.execute(
+            update(_resumo)
+            .where(*[_resumo.c[coluna] == linha[coluna] for coluna in _CHAVE])
+            .values(quantidade=_resumo.c.quantidade + linha["quantidade"])
+        ).rowcount
+        if not atualizadas:
+            conn.execute(insert(_resumo), linha)
+
+
+def contar_novas(db: Session, consultas: Iterable):
+    """
+    Conta consultas recém-criadas (entram sempre como AGENDADA).
+    Chamar antes do commit, na mesma transação da inserção.
+    """
+    variacoes = Counter(
+        (c.profissional_id, c.data_hora.date(), models.StatusConsultaEnum.AGENDADA)
+        for c in consultas
+    )
+    _aplicar(db.connection(), variacoes)
+
+
+def mudar_status(db: Session, consulta: models.Consulta, novo: models.StatusConsultaEnum) -> bool:
+    """
+    Troca o status da consulta e move a contagem entre os status.
+    A troca é condicional ao status lido (UPDATE ... WHERE status = anterior):
+    se outra transação já mudou a consulta, nada é alterado e devolve False.
+    A contagem anterior nunca fica negativa: se não há o que descontar (resumo
+    fora de sincronia, p.ex. consulta anterior ao backfill), o dia do
+    profissional é recontado a partir das consultas.
+    """
+    anterior = consulta.status
+    if anterior == novo:
+        return False
+    c = models.Consulta.__table__.c
+    conn = db.connection()
+    trocou = conn.execute(
+        update(models.Consulta.__table__)
+        .where(c.id == consulta.id, c.status == anterior)
+        .values(status=novo)
+    ).rowcount == 1
+    if not trocou:
+        return False
+    set_committed_value(consulta, "status", novo)
+
+    pid, dia = consulta.profissional_id, consulta.data_hora.date()
+    descontou = True
+    # Em ordem de chave, como em _aplicar
+    for status in sorted((anterior, novo)):
+        if status == novo:
+            _aplicar(conn, Counter({(pid, dia, novo): 1}))
+            continue
+        descontou = conn.execute(
+            update(_resumo)
+            .where(
+                _resumo.c.profissional_id == pid,
+                _resumo.c.dia == dia,
+                _resumo.c.status == anterior,
+                _resumo.c.quantidade > 0,
+            )
+            .values(quantidade=_resumo.c.quantidade - 1)
+        ).rowcount > 0
+    if not descontou:
+        reconstruir(conn, dia, dia, profissional_id=pid)
+    return True
+
+
+# --------- Reconstrução ---------
+
+def reconstruir(
+    conn: Connection,
+    de: Optional[date] = None,
+    ate: Optional[date] = None,
+    profissional_id: Optional[int] = None,
+) -> int:
+    """
+    Recalcula o resumo a partir de `consultas` (todo o histórico ou só os
+    dias de `de` a `ate`, opcionalmente de um profissional).
+    Devolve quantas linhas do resumo foram gravadas.
+    """
+    c = models.Consulta.__table__.c
+    dia = func.date(c.data_hora)
+    apagar = delete(_resumo)
+    agregar = select(c.profissional_id, dia, c.status, func.count()).group_by(
+        c.profissional_id, dia, c.status
+    )
+    if de is not None:
+        apagar = apagar.where(_resumo.c.dia >= de)
+        agregar = agregar.where(c.data_hora >= datetime.combine(de, time.min))
+    if ate is not None:
+        apagar = apagar.where(_resumo.c.dia <= ate)
+        agregar = agregar.where(c.data_hora < datetime.combine(ate + timedelta(days=1), time.min))
+    if profissional_id is not None:
+        apagar = apagar.where(_resumo.c.profissional_id == profissional_id)
+        agregar = agregar.where(c.profissional_id == profissional_id)
+
+    conn.execute(apagar)
+    return conn.execute(
+        insert(_resumo).from_select([*_CHAVE, "quantidade"], agregar)
+    ).rowcount
+
+
+def _travar_preparacao(conn: Connection):
+    """
+    Serializa a preparação entre workers que sobem juntos, até o fim da
+    transação. No PostgreSQL é um advisory lock; no SQLite, um UPDATE sem
+    efeito obtém a trava de escrita do banco antes da verificação.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(select(func.pg_advisory_xact_lock(TRAVA_PREPARAR)))
+    elif conn.dialect.name == "sqlite":
+        conn.execute(
+            update(_resumo).where(false()).values(quantidade=_resumo.c.quantidade)
+        )
+
+
+def preparar(engine):
+    """
+    Popula o resumo na primeira subida sobre um banco que já tinha consultas.
+    Só um worker reconstrói; os demais esperam a trava e encontram o resumo pronto.
+    """
+    with engine.begin() as conn:
+        _travar_preparacao(conn)
+        vazio = conn.execute(select(_resumo.c.dia).limit(1)).first() is None
+        if vazio and conn.execute(select(models.Consulta.id).limit(1)).first() is not None:
+            reconstruir(conn)
+
+
+# --------- Relatório ---------
+
+def _contagem() -> dict:
+    return {campo: 0 for campo in CAMPOS_STATUS.values()}
+
+
+def _fechar(contagem: dict) -> dict:
+    total = sum(contagem.values())
+    taxa = round(contagem["canceladas"] / total, 4) if total else 0.0
+    return {**contagem, "total": total, "taxa_cancelamento": taxa}
+
+
+def relatorio_agenda(db: Session, de: date, ate: date, profissional_id: Optional[int] = None) -> dict:
+    """
+    Contagens por profissional e dia, totais por profissional e geral,
+    lidos só do resumo (uma linha por profissional × dia × status).
+    """
+    r = models.ResumoAgenda
+    query = db.query(r.profissional_id, r.dia, r.status, r.quantidade).filter(
+        r.dia >= de, r.dia <= ate
+    )
+    if profissional_id is not None:
+        query = query.filter(r.profissional_id == profissional_id)
+
+    dias: dict = {}
+    profissionais: dict = {}
+    geral = _contagem()
+    for pid, dia, status, quantidade in query.order_by(r.profissional_id, r.dia):
+        if quantidade <= 0:
+            continue
+        campo = CAMPOS_STATUS[status]
+        dias.setdefault((pid, dia), _contagem())[campo] += quantidade
+        profissionais.setdefault(pid, _contagem())[campo] += quantidade
+        geral[campo] += quantidade
+
+    return {
+        "de": de,
+        "ate": ate,
+        "dias": [
+            {"profissional_id": pid, "dia": dia, **_fechar(contagem)}
+            for (pid, dia), contagem in dias.items()
+        ],
+        "profissionais": [
+            {"profissional_id": pid, **_fechar(contagem)}
+            for pid, contagem in profissionais.items()
+        ],
+        "geral": _fechar(geral),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstrói o resumo da agenda a partir das consultas.")
+    parser.add_argument("--de", type=date.fromisoformat, help="primeiro dia (AAAA-MM-DD)")
+    parser.add_argument("--ate", type=date.fromisoformat, help="último dia (AAAA-MM-DD)")
+    args = parser.parse_args()
+
+    from .database import engine
+
+    models.Base.metadata.create_all(bind=engine, tables=[_resumo])
+    with engine.begin() as conn:
+        linhas = reconstruir(conn, args.de, args.ate)
+    print(f"Resumo da agenda reconstruído: {linhas} linhas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy.orm import Session
+
+from .. import models, relatorios, schemas, serializacao
+from ..agenda import buscar_conflito, travar_profissionais
+from ..auth import exigir_role
+from ..database import get_db
+from ..importacao import (
+    TAMANHO_LOTE_MAXIMO,
+    TAMANHO_LOTE_PADRAO,
+    importar,
+    processar_lote_consultas,
+)
+from ..paginacao import (
+    LIMITE_MAXIMO,
+    LIMITE_PADRAO,
+    aceita_ndjson,
+    aplicar_cursor,
+    paginar,
+    stream_ndjson,
+)
+
+router = APIRouter()
+
+
+@router.post(
+    "/",
+    response_model=schemas.ConsultaOut,
+    status_code=status.HTTP_201_CREATED,
+)
+def agendar_consulta(
+    cons_in: schemas.ConsultaCreate,
+    db: Session = Depends(get_db),
+    usuario=Depends(exigir_role(models.RoleEnum.ADMIN, models.RoleEnum.ATENDENTE)),
+):
+    """
+    Agenda uma nova consulta.
+    Regras:
+    - Paciente e profissional devem existir e estar ativos.
+    - Não permitir consultas sobrepostas (data_hora + duração) para o mesmo profissional.
+    O profissional é travado até o commit, serializando agendamentos
+    concorrentes do mesmo profissional.
+    """
+    paciente = db.query(models.Paciente).get(cons_in.paciente_id)
+    if not paciente or not paciente.ativo:
+        raise HTTPException(status_code=400, detail="Paciente inválido")
+
+    travar_profissionais(db, [cons_in.profissional_id])
+    profissional = db.query(models.Profissional).get(cons_in.profissional_id)
+    if not profissional or not profissional.ativo:
+        raise HTTPException(status_code=400, detail="Profissional inválido")
+
+    conflito = buscar_conflito(
+        db, cons_in.profissional_id, cons_in.data_hora, cons_in.duracao_minutos
+    )
+    if conflito:
+        raise HTTPException(
+            status_code=400,
+            detail="Profissional já possui consulta nesse horário",
+        )
+
+    consulta = models.Consulta(
+        paciente_id=cons_in.paciente_id,
+        profissional_id=cons_in.profissional_id,
+        data_hora=cons_in.data_hora,
+        duracao_minutos=cons_in.duracao_minutos,
+        observacoes=cons_in.observacoes,
+    )
+    db.add(consulta)
+    relatorios.contar_novas(db, [consulta])
+    db.commit()
+    db.refresh(consulta)
+    return consulta
+
+
+@router.post(
+    "/bulk",
+    response_model=schemas.RelatorioImportacao,
+)
+async def importar_consultas(
+    request: Request,
+    tamanho_lote: int = Query(default=TAMANHO_LOTE_PADRAO, ge=1, le=TAMANHO_LOTE_MAXIMO),
+    atomico: bool = False,
+    db: Session = Depends(get_db),
+    usuario=Depends(exigir_role(models.RoleEnum.ADMIN, models.RoleEnum.ATENDENTE)),
+):
+    """
+    Importa consultas em lote a partir de um corpo NDJSON (padrão) ou CSV
+    (`Content-Type: text/csv`, com cabeçalho), lido em streaming.
+    Regras: paciente/profissional ativos e sem sobreposição de horário.
+    Com `atomico=true` o corpo é recebido por inteiro antes de gravar, e nada
+    é gravado se alguma linha falhar; caso contrário
+    as linhas válidas são confirmadas lote a lote.
+    Devolve o resultado de cada linha (criado / duplicado / invalido / revertido).
+    """
+    return await importar(request, db, processar_lote_consultas, tamanho_lote, atomico)
+
+
+@router.get(
+    "/",
+    response_model=schemas.Pagina[schemas.ConsultaOut],
+)
+def listar_consultas(
+    request: Request,
+    db: Session = Depends(get_db),
+    usuario=Depends(
+        exigir_role(
+            models.RoleEnum.ADMIN,
+            models.RoleEnum.ATENDENTE,
+            models.RoleEnum.MEDICO,
+        )
+    ),
+    paciente_id: Optional[int] = None,
+    profissional_id: Optional[int] = None,
+    status_consulta: Optional[models.StatusConsultaEnum] = Query(default=None),
+    limite: int = Query(default=LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    cursor: Optional[str] = None,
+    rapido: bool = False,
+):
+    """
+    Lista consultas com filtros opcionais por paciente, profissional e status.
+    Ordenadas por data/hora, com paginação por cursor (keyset em data_hora, id).
+    Com `Accept: application/x-ndjson` devolve todas as linhas em streaming.
+    Com `rapido=true` lê só as colunas do schema, sem instâncias ORM (mesma saída).
+    """
+    chaves = (models.Consulta.data_hora, models.Consulta.id)
+    query = serializacao.consultas.query(db) if rapido else db.query(models.Consulta)
+    if paciente_id is not None:
+        query = query.filter(models.Consulta.paciente_id == paciente_id)
+    if profissional_id is not None:
+        query = query.filter(models.Consulta.profissional_id == profissional_id)
+    if status_consulta is not None:
+        query = query.filter(models.Consulta.status == status_consulta)
+    query = aplicar_cursor(query, chaves, cursor)
+
+    if aceita_ndjson(request):
+        return stream_ndjson(query, chaves, schemas.ConsultaOut)
+    pagina = paginar(query, chaves, limite)
+    if rapido:
+        return serializacao.consultas.pagina(pagina)
+    return pagina
+
+
+@router.put(
+    "/{consulta_id}/cancelar",
+    response_model=schemas.ConsultaOut,
+)
+def cancelar_consulta(
+    consulta_id: int,
+    db: Session = Depends(get_db),
+    usuario=Depends(
+        exigir_role(
+            models.RoleEnum.ADMIN,
+            models.RoleEnum.ATENDENTE,
+            models.RoleEnum.MEDICO,
+        )
+    ),
+):
+    """
+    Cancela uma consulta:
+    - Só pode cancelar se estiver AGENDADA.
+    - Não pode cancelar se a data/hora já passou.
+    """
+    consulta = db.query(models.Consulta).get(consulta_id)
+    if not consulta:
+        raise HTTPException(status_code=404, detail="Consulta não encontrada")
+
+    if consulta.status != models.StatusConsultaEnum.AGENDADA:
+        raise HTTPException(
+            status_code=400,
+            detail="Apenas consultas agendadas podem ser canceladas",
+        )
+
+    if consulta.data_hora <= datetime.utcnow():
+        raise HTTPException(
+            status_code=400,
+            detail="Não é possível cancelar consulta passada",
+        )
+
+    # Troca condicional: um cancelamento concorrente que já passou
+    # pela verificação acima não altera a consulta nem o resumo
+    if not relatorios.mudar_status(db, consulta, models.StatusConsultaEnum.CANCELADA):
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Apenas consultas agendadas podem ser canceladas",
+        )
+    db.commit()
+    db.refresh(consulta)
+    return consulta
@@ -0,0 +1,226 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session
+
+from .. import busca, models, schemas, serializacao
+from ..auth import exigir_role
+from ..database import get_db
+from ..importacao import (
+    TAMANHO_LOTE_MAXIMO,
+    TAMANHO_LOTE_PADRAO,
+    importar,
+    processar_lote_pacientes,
+)
+from ..paginacao import (
+    LIMITE_MAXIMO,
+    LIMITE_PADRAO,
+    aceita_ndjson,
+    aplicar_cursor,
+    paginar,
+    stream_ndjson,
+)
+
+router = APIRouter()
+
+
+@router.post(
+    "/",
+    response_model=schemas.PacienteOut,
+    status_code=status.HTTP_201_CREATED,
+)
+def criar_paciente(
+    paciente_in: schemas.PacienteCreate,
+    db: Session = Depends(get_db),
+    usuario=Depends(exigir_role(models.RoleEnum.ADMIN, models.RoleEnum.ATENDENTE)),
+):
+    """
+    Cria um novo paciente.
+    Regra: CPF deve ser único.
+    """
+    existente = (
+        db.query(models.Paciente)
+        .filter(models.Paciente.cpf == paciente_in.cpf)
+        .first()
+    )
+    if existente:
+        raise HTTPException(status_code=400, detail="CPF já cadastrado")
+
+    paciente = models.Paciente(**paciente_in.dict())
+    db.add(paciente)
+    db.commit()
+    db.refresh(paciente)
+    return paciente
+
+
+@router.post(
+    "/bulk",
+    response_model=schemas.RelatorioImportacao,
+)
+async def importar_pacientes(
+    request: Request,
+    tamanho_lote: int = Query(default=TAMANHO_LOTE_PADRAO, ge=1, le=TAMANHO_LOTE_MAXIMO),
+    atomico: bool = False,
+    db: Session = Depends(get_db),
+    usuario=Depends(exigir_role(models.RoleEnum.ADMIN, models.RoleEnum.ATENDENTE)),
+):
+    """
+    Importa pacientes em lote a partir de um corpo NDJSON (padrão) ou CSV
+    (`Content-Type: text/csv`, com cabeçalho), lido em streaming.
+    Regra: CPF único (no banco e dentro do próprio arquivo).
+    Com `atomico=true` o corpo é recebido por inteiro antes de gravar, e nada
+    é gravado se alguma linha falhar; caso contrário
+    as linhas válidas são confirmadas lote a lote.
+    Devolve o resultado de cada linha (criado / duplicado / invalido / revertido).
+    """
+    return await importar(request, db, processar_lote_pacientes, tamanho_lote, atomico)
+
+
+@router.get(
+    "/",
+    response_model=schemas.Pagina[schemas.PacienteOut],
+)
+def listar_pacientes(
+    request: Request,
+    ativo: bool = True,
+    limite: int = Query(default=LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    cursor: Optional[str] = None,
+    rapido: bool = False,
+    db: Session = Depends(get_db),
+    usuario=Depends(
+        exigir_role(
+            models.RoleEnum.ADMIN,
+            models.RoleEnum.ATENDENTE,
+            models.RoleEnum.MEDICO,
+        )
+    ),
+):
+    """
+    Lista pacientes, filtrando por ativo/inativo.
+    Paginação por cursor (keyset em id): passe o `next` da resposta em `cursor`.
+    Com `Accept: application/x-ndjson` devolve todas as linhas em streaming.
+    Com `rapido=true` lê só as colunas do schema, sem instâncias ORM (mesma saída).
+    """
+    chaves = (models.Paciente.id,)
+    query = serializacao.pacientes.query(db) if rapido else db.query(models.Paciente)
+    query = query.filter(models.Paciente.ativo == ativo)
+    query = aplicar_cursor(query, chaves, cursor)
+
+    if aceita_ndjson(request):
+        return stream_ndjson(query, chaves, schemas.PacienteOut)
+    pagina = paginar(query, chaves, limite)
+    if rapido:
+        return serializacao.pacientes.pagina(pagina)
+    return pagina
+
+
+@router.get(
+    "/busca",
+    response_model=List[schemas.PacienteOut],
+)
+def buscar_pacientes(
+    q: str = Query(min_length=1, max_length=100),
+    limite: int = Query(default=busca.LIMITE_PADRAO, ge=1, le=busca.LIMITE_MAXIMO),
+    db: Session = Depends(get_db),
+    usuario=Depends(
+        exigir_role(
+            models.RoleEnum.ADMIN,
+            models.RoleEnum.ATENDENTE,
+            models.RoleEnum.MEDICO,
+        )
+    ),
+):
+    """
+    Busca pacientes ativos por nome, CPF ou telefone, sem diferenciar
+    maiúsculas nem acentos. Aceita prefixos e trechos ("jose sil", "123.45").
+    Resultados ordenados por relevância: CPF exato, início do CPF, início do
+    nome, início de palavras do nome, telefone e, por fim, demais trechos.
+    """
+    ids = busca.indice.buscar(db.connection(), q, limite)
+    if not ids:
+        return []
+    pacientes = {
+        p.id: p for p in db.query(models.Paciente).filter(models.Paciente.id.in_(ids))
+    }
+    return [pacientes[i] for i in ids if i in pacientes]
+
+
+@router.get(
+    "/{paciente_id}",
+    response_model=schemas.PacienteOut,
+)
+def obter_paciente(
+    paciente_id: int,
+    rapido: bool = False,
+    db: Session = Depends(get_db),
+    usuario=Depends(
+        exigir_role(
+            models.RoleEnum.ADMIN,
+            models.RoleEnum.ATENDENTE,
+            models.RoleEnum.MEDICO,
+        )
+    ),
+):
+    """
+    Obtém um paciente pelo ID.
+    """
+    if rapido:
+        linha = (
+            serializacao.pacientes.query(db)
+            .filter(models.Paciente.id == paciente_id)
+            .first()
+        )
+        if linha is None:
+            raise HTTPException(status_code=404, detail="Paciente não encontrado")
+        return serializacao.pacientes.item(linha)
+
+    paciente = db.query(models.Paciente).get(paciente_id)
+    if not paciente:
+        raise HTTPException(status_code=404, detail="Paciente não encontrado")
+    return paciente
+
+
+@router.put(
+    "/{paciente_id}",
+    response_model=schemas.PacienteOut,
+)
+def atualizar_paciente(
+    paciente_id: int,
+    paciente_in: schemas.PacienteUpdate,
+    db: Session = Depends(get_db),
+    usuario=Depends(exigir_role(models.RoleEnum.ADMIN, models.RoleEnum.ATENDENTE)),
+):
+    """
+    Atualiza dados de um paciente.
+    """
+    paciente = db.query(models.Paciente).get(paciente_id)
+    if not paciente:
+        raise HTTPException(status_code=404, detail="Paciente não encontrado")
+
+    for campo, valor in paciente_in.dict(exclude_unset=True).items():
+        setattr(paciente, campo, valor)
+
+    db.commit()
+    db.refresh(paciente)
+    return paciente
+
+
+@router.delete(
+    "/{paciente_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+def inativar_paciente(
+    paciente_id: int,
+    db: Session = Depends(get_db),
+    usuario=Depends(exigir_role(models.RoleEnum.ADMIN)),
+):
+    """
+    Inativa paciente (não apaga do banco).
+    """
+    paciente = db.query(models.Paciente).get(paciente_id)
+    if not paciente:
+        raise HTTPException(status_code=404, detail="Paciente não encontrado")
+
+    paciente.ativo = False
+    db.commit()
+    return
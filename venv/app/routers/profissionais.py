@@ -0,0 +1,259 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session
+
+from .. import models, schemas, serializacao
+from ..agenda import (
+    DURACAO_MAXIMA_MINUTOS,
+    DURACAO_PADRAO_MINUTOS,
+    PERIODO_MAXIMO_DISPONIBILIDADE,
+    disponibilidade,
+    sem_fuso,
+)
+from ..auth import exigir_role
+from ..database import get_db
+from ..paginacao import (
+    LIMITE_MAXIMO,
+    LIMITE_PADRAO,
+    aceita_ndjson,
+    aplicar_cursor,
+    paginar,
+    stream_ndjson,
+)
+
+router = APIRouter()
+
+
+# Profissionais por página em /disponibilidade (cada um pode render milhares de horários)
+LIMITE_PADRAO_DISPONIBILIDADE = 10
+LIMITE_MAXIMO_DISPONIBILIDADE = 20
+
+
+def _validar_periodo(de: datetime, ate: datetime) -> Tuple[datetime, datetime]:
+    de, ate = sem_fuso(de), sem_fuso(ate)
+    if ate <= de:
+        raise HTTPException(status_code=400, detail="Período inválido")
+    if ate - de > PERIODO_MAXIMO_DISPONIBILIDADE:
+        raise HTTPException(status_code=400, detail="Período máximo é de 31 dias")
+    return de, ate
+
+
+def _montar_disponibilidade(livres: dict) -> List[dict]:
+    return [
+        {
+            "profissional_id": pid,
+            "horarios": [{"inicio": inicio, "fim": fim} for inicio, fim in horarios],
+        }
+        for pid, horarios in livres.items()
+    ]
+
+
+@router.post(
+    "/",
+    response_model=schemas.ProfissionalOut,
+    status_code=status.HTTP_201_CREATED,
+)
+def criar_profissional(
+    prof_in: schemas.ProfissionalCreate,
+    db: Session = Depends(get_db),
+    usuario=Depends(exigir_role(models.RoleEnum.ADMIN)),
+):
+    """
+    Cria um profissional de saúde.
+    Apenas ADMIN pode criar.
+    """
+    profissional = models.Profissional(**prof_in.dict())
+    db.add(profissional)
+    db.commit()
+    db.refresh(profissional)
+    return profissional
+
+
+@router.get(
+    "/",
+    response_model=schemas.Pagina[schemas.ProfissionalOut],
+)
+def listar_profissionais(
+    request: Request,
+    ativo: bool = True,
+    limite: int = Query(default=LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    cursor: Optional[str] = None,
+    rapido: bool = False,
+    db: Session = Depends(get_db),
+    usuario=Depends(
+        exigir_role(
+            models.RoleEnum.ADMIN,
+            models.RoleEnum.ATENDENTE,
+            models.RoleEnum.MEDICO,
+        )
+    ),
+):
+    """
+    Lista profissionais, filtrando por ativo/inativo.
+    Paginação por cursor (keyset em id): passe o `next` da resposta em `cursor`.
+    Com `Accept: application/x-ndjson` devolve todas as linhas em streaming.
+    Com `rapido=true` lê só as colunas do schema, sem instâncias ORM (mesma saída).
+    """
+    chaves = (models.Profissional.id,)
+    query = serializacao.profissionais.query(db) if rapido else db.query(models.Profissional)
+    query = query.filter(models.Profissional.ativo == ativo)
+    query = aplicar_cursor(query, chaves, cursor)
+
+    if aceita_ndjson(request):
+        return stream_ndjson(query, chaves, schemas.ProfissionalOut)
+    pagina = paginar(query, chaves, limite)
+    if rapido:
+        return serializacao.profissionais.pagina(pagina)
+    return pagina
+
+
+@router.get(
+    "/disponibilidade",
+    response_model=schemas.Pagina[schemas.DisponibilidadeOut],
+)
+def listar_disponibilidade(
+    de: datetime,
+    ate: datetime,
+    especialidade: Optional[str] = None,
+    duracao_minutos: int = Query(default=DURACAO_PADRAO_MINUTOS, ge=5, le=DURACAO_MAXIMA_MINUTOS),
+    limite: int = Query(
+        default=LIMITE_PADRAO_DISPONIBILIDADE, ge=1, le=LIMITE_MAXIMO_DISPONIBILIDADE
+    ),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    usuario=Depends(
+        exigir_role(
+            models.RoleEnum.ADMIN,
+            models.RoleEnum.ATENDENTE,
+            models.RoleEnum.MEDICO,
+        )
+    ),
+):
+    """
+    Horários livres dos profissionais ativos (opcionalmente de uma
+    especialidade) no período [de, ate), calculados com uma única consulta
+    por página. Paginado por profissional (keyset em id): passe o `next`
+    da resposta em `cursor`.
+    """
+    de, ate = _validar_periodo(de, ate)
+    chaves = (models.Profissional.id,)
+    query = db.query(models.Profissional.id).filter(models.Profissional.ativo.is_(True))
+    if especialidade is not None:
+        query = query.filter(models.Profissional.especialidade == especialidade)
+    pagina = paginar(aplicar_cursor(query, chaves, cursor), chaves, limite)
+    ids = [pid for (pid,) in pagina["itens"]]
+    itens = _montar_disponibilidade(disponibilidade(db, ids, de, ate, duracao_minutos)) if ids else []
+    return {"itens": itens, "next": pagina["next"]}
+
+
+@router.get(
+    "/{profissional_id}",
+    response_model=schemas.ProfissionalOut,
+)
+def obter_profissional(
+    profissional_id: int,
+    rapido: bool = False,
+    db: Session = Depends(get_db),
+    usuario=Depends(
+        exigir_role(
+            models.RoleEnum.ADMIN,
+            models.RoleEnum.ATENDENTE,
+            models.RoleEnum.MEDICO,
+        )
+    ),
+):
+    """
+    Obtém um profissional pelo ID.
+    """
+    if rapido:
+        linha = (
+            serializacao.profissionais.query(db)
+            .filter(models.Profissional.id == profissional_id)
+            .first()
+        )
+        if linha is None:
+            raise HTTPException(status_code=404, detail="Profissional não encontrado")
+        return serializacao.profissionais.item(linha)
+
+    profissional = db.query(models.Profissional).get(profissional_id)
+    if not profissional:
+        raise HTTPException(status_code=404, detail="Profissional não encontrado")
+    return profissional
+
+
+@router.get(
+    "/{profissional_id}/disponibilidade",
+    response_model=schemas.DisponibilidadeOut,
+)
+def obter_disponibilidade(
+    profissional_id: int,
+    de: datetime,
+    ate: datetime,
+    duracao_minutos: int = Query(default=DURACAO_PADRAO_MINUTOS, ge=5, le=DURACAO_MAXIMA_MINUTOS),
+    db: Session = Depends(get_db),
+    usuario=Depends(
+        exigir_role(
+            models.RoleEnum.ADMIN,
+            models.RoleEnum.ATENDENTE,
+            models.RoleEnum.MEDICO,
+        )
+    ),
+):
+    """
+    Horários livres do profissional no período [de, ate), dentro do expediente.
+    """
+    de, ate = _validar_periodo(de, ate)
+    profissional = db.query(models.Profissional).get(profissional_id)
+    if not profissional:
+        raise HTTPException(status_code=404, detail="Profissional não encontrado")
+    return _montar_disponibilidade(
+        disponibilidade(db, [profissional_id], de, ate, duracao_minutos)
+    )[0]
+
+
+@router.put(
+    "/{profissional_id}",
+    response_model=schemas.ProfissionalOut,
+)
+def atualizar_profissional(
+    profissional_id: int,
+    prof_in: schemas.ProfissionalUpdate,
+    db: Session = Depends(get_db),
+    usuario=Depends(exigir_role(models.RoleEnum.ADMIN)),
+):
+    """
+    Atualiza dados de um profissional.
+    """
+    profissional = db.query(models.Profissional).get(profissional_id)
+    if not profissional:
+        raise HTTPException(status_code=404, detail="Profissional não encontrado")
+
+    for campo, valor in prof_in.dict(exclude_unset=True).items():
+        setattr(profissional, campo, valor)
+
+    db.commit()
+    db.refresh(profissional)
+    return profissional
+
+
+@router.delete(
+    "/{profissional_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+def inativar_profissional(
+    profissional_id: int,
+    db: Session = Depends(get_db),
+    usuario=Depends(exigir_role(models.RoleEnum.ADMIN)),
+):
+    """
+    Inativa profissional (não apaga do banco).
+    """
+    profissional = db.query(models.Profissional).get(profissional_id)
+    if not profissional:
+        raise HTTPException(status_code=404, detail="Profissional não encontrado")
+
+    profissional.ativo = False
+    db.commit()
+    return
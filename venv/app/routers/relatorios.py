@@ -0,0 +1,35 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..auth import exigir_role
+from ..database import get_db
+from ..relatorios import PERIODO_MAXIMO_RELATORIO, relatorio_agenda
+
+router = APIRouter()
+
+
+@router.get(
+    "/agenda",
+    response_model=schemas.RelatorioAgenda,
+)
+def relatorio_da_agenda(
+    de: date,
+    ate: date,
+    profissional_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    usuario=Depends(exigir_role(models.RoleEnum.ADMIN)),
+):
+    """
+    Consultas por profissional e dia (agendadas, canceladas, realizadas)
+    e taxa de cancelamento, de `de` a `ate` (inclusive).
+    Lido do resumo da agenda, sem varrer a tabela de consultas.
+    """
+    if ate < de:
+        raise HTTPException(status_code=400, detail="Período inválido")
+    if ate - de >= PERIODO_MAXIMO_RELATORIO:
+        raise HTTPException(status_code=400, detail="Período máximo é de 366 dias")
+    return relatorio_agenda(db, de, ate, profissional_id)
@@ -0,0 +1,201 @@
+from datetime import datetime, date
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from .models import RoleEnum, StatusConsultaEnum
+from .agenda import DURACAO_MAXIMA_MINUTOS, DURACAO_PADRAO_MINUTOS, sem_fuso
+
+
+# --------- Usuário / Autenticação ---------
+
+class UsuarioCreate(BaseModel):
+    email: EmailStr = Field(max_length=120)
+    senha: str
+    role: RoleEnum
+
+
+class UsuarioOut(BaseModel):
+    id: int
+    email: EmailStr
+    role: RoleEnum
+    ativo: bool
+
+    class Config:
+        from_attributes = True
+
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+
+
+class LoginRequest(BaseModel):
+    email: EmailStr
+    senha: str
+
+
+# --------- Paciente ---------
+
+# Limites de tamanho iguais aos das colunas em models.py
+
+class PacienteBase(BaseModel):
+    nome: str = Field(max_length=120)
+    cpf: str = Field(max_length=11)
+    data_nascimento: Optional[date] = None
+    telefone: Optional[str] = Field(default=None, max_length=20)
+    email: Optional[EmailStr] = Field(default=None, max_length=120)
+    endereco: Optional[str] = Field(default=None, max_length=255)
+    dados_clinicos_resumidos: Optional[str] = Field(default=None, max_length=500)
+
+
+class PacienteCreate(PacienteBase):
+    pass
+
+
+class PacienteUpdate(PacienteBase):
+    pass
+
+
+class PacienteOut(PacienteBase):
+    id: int
+    ativo: bool
+
+    class Config:
+        from_attributes = True
+
+
+# --------- Profissional ---------
+
+class ProfissionalBase(BaseModel):
+    nome: str = Field(max_length=120)
+    documento_registro: str = Field(max_length=30)
+    especialidade: Optional[str] = Field(default=None, max_length=120)
+    email: Optional[EmailStr] = Field(default=None, max_length=120)
+    telefone: Optional[str] = Field(default=None, max_length=20)
+
+
+class ProfissionalCreate(ProfissionalBase):
+    pass
+
+
+class ProfissionalUpdate(ProfissionalBase):
+    pass
+
+
+class ProfissionalOut(ProfissionalBase):
+    id: int
+    ativo: bool
+
+    class Config:
+        from_attributes = True
+
+
+# --------- Consulta ---------
+
+class ConsultaBase(BaseModel):
+    paciente_id: int
+    profissional_id: int
+    data_hora: datetime
+    duracao_minutos: int = Field(default=DURACAO_PADRAO_MINUTOS, ge=1, le=DURACAO_MAXIMA_MINUTOS)
+    observacoes: Optional[str] = Field(default=None, max_length=500)
+
+    @field_validator("data_hora")
+    @classmethod
+    def _data_hora_sem_fuso(cls, valor: datetime) -> datetime:
+        # Gravada em UTC sem fuso, como todas as datas do banco
+        return sem_fuso(valor)
+
+
+class ConsultaCreate(ConsultaBase):
+    pass
+
+
+class ConsultaUpdate(BaseModel):
+    data_hora: Optional[datetime] = None
+    observacoes: Optional[str] = None
+    status: Optional[StatusConsultaEnum] = None
+
+    @field_validator("data_hora")
+    @classmethod
+    def _data_hora_sem_fuso(cls, valor: Optional[datetime]) -> Optional[datetime]:
+        return sem_fuso(valor) if valor is not None else None
+
+
+class ConsultaOut(BaseModel):
+    id: int
+    paciente_id: int
+    profissional_id: int
+    data_hora: datetime
+    duracao_minutos: int
+    status: StatusConsultaEnum
+    observacoes: Optional[str] = None
+    criado_em: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# --------- Disponibilidade ---------
+
+class HorarioLivre(BaseModel):
+    inicio: datetime
+    fim: datetime
+
+
+class DisponibilidadeOut(BaseModel):
+    profissional_id: int
+    horarios: List[HorarioLivre]
+
+
+# --------- Importação em lote ---------
+
+class ResultadoLinha(BaseModel):
+    linha: int
+    status: str  # criado, duplicado, invalido ou revertido
+    id: Optional[int] = None
+    erro: Optional[str] = None
+
+
+class RelatorioImportacao(BaseModel):
+    criados: int
+    duplicados: int
+    invalidos: int
+    confirmado: bool
+    linhas: List[ResultadoLinha]
+
+
+# --------- Paginação ---------
+
+T = TypeVar("T")
+
+
+class Pagina(BaseModel, Generic[T]):
+    itens: List[T]
+    next: Optional[str] = None
+
+
+# --------- Relatórios ---------
+
+class ContagemAgenda(BaseModel):
+    agendadas: int = 0
+    canceladas: int = 0
+    realizadas: int = 0
+    total: int = 0
+    taxa_cancelamento: float = 0.0  # canceladas / total
+
+
+class AgendaDia(ContagemAgenda):
+    profissional_id: int
+    dia: date
+
+
+class AgendaProfissional(ContagemAgenda):
+    profissional_id: int
+
+
+class RelatorioAgenda(BaseModel):
+    de: date
+    ate: date
+    dias: List[AgendaDia]
+    profissionais: List[AgendaProfissional]
+    geral: ContagemAgenda
@@ -0,0 +1,128 @@
+import asyncio
+import hmac
+import multiprocessing
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from . import config
+
+# Este módulo é importado pelos processos do pool: manter só dependências leves.
+
+TIMEOUT_SEGUNDOS = 30
+
+
+class PoolSenhasSaturado(Exception):
+    """
+    Todas as vagas do pool de hash estão ocupadas; a requisição deve ser recusada.
+    """
+
+
+# --------- Funções executadas nos processos do pool ---------
+
+def _bytes(senha: str) -> bytes:
+    # O bcrypt só considera os primeiros 72 bytes
+    return senha.encode("utf-8")[:72]
+
+
+def calcular_hash(senha: str, rounds: int) -> str:
+    return bcrypt.hashpw(_bytes(senha), bcrypt.gensalt(rounds=rounds)).decode()
+
+
+def _conferir(senha: str, armazenado: str) -> bool:
+    return bcrypt.checkpw(_bytes(senha), armazenado.encode())
+
+
+# --------- Pool ---------
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_vagas = threading.BoundedSemaphore(config.HASH_MAX_PENDENTES)
+
+
+def _obter_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=config.HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+async def _executar(funcao, *args):
+    """
+    Executa no pool sem fila ilimitada: se não há vaga, falha na hora
+    em vez de deixar a requisição esperando. A espera não ocupa thread;
+    a vaga só é devolvida quando o processo termina, mesmo após o timeout.
+    """
+    if not _vagas.acquire(blocking=False):
+        raise PoolSenhasSaturado()
+    try:
+        futuro = _obter_executor().submit(funcao, *args)
+    except BaseException:
+        _vagas.release()
+        raise
+    futuro.add_done_callback(lambda _: _vagas.release())
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(futuro), TIMEOUT_SEGUNDOS)
+    except asyncio.TimeoutError:
+        raise PoolSenhasSaturado()
+
+
+def encerrar():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+# --------- API ---------
+
+def _eh_bcrypt(armazenado: str) -> bool:
+    return armazenado.startswith(("$2a$", "$2b$", "$2y$"))
+
+
+async def gerar_hash(senha: str) -> str:
+    return await _executar(calcular_hash, senha, config.BCRYPT_ROUNDS)
+
+
+async def verificar(senha: str, armazenado: str) -> bool:
+    """
+    Confere a senha com o hash armazenado. Senhas legadas em texto puro
+    são comparadas em tempo constante, sem ocupar o pool.
+    """
+    if not _eh_bcrypt(armazenado):
+        return hmac.compare_digest(senha.encode("utf-8"), armazenado.encode("utf-8"))
+    return await _executar(_conferir, senha, armazenado)
+
+
+_hash_ficticio: Optional[str] = None
+
+
+async def verificar_ficticio(senha: str) -> None:
+    """
+    Gasta o mesmo bcrypt de uma verificação real, para que emails
+    inexistentes ou inativos não respondam mais rápido no login.
+    """
+    global _hash_ficticio
+    if _hash_ficticio is None:
+        _hash_ficticio = await gerar_hash(secrets.token_urlsafe(16))
+    await _executar(_conferir, senha, _hash_ficticio)
+
+
+def precisa_rehash(armazenado: str) -> bool:
+    """
+    True para senhas em texto puro ou com custo diferente do configurado.
+    """
+    if not _eh_bcrypt(armazenado):
+        return True
+    try:
+        return int(armazenado.split("$")[2]) != config.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
@@ -0,0 +1,46 @@
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Query, Session
+
+from . import models, schemas
+
+
+class SerializadorRapido:
+    """
+    Caminho rápido de leitura: seleciona só as colunas do schema *Out
+    (linhas leves, sem instâncias ORM nem identity map) e valida/serializa
+    em lote com TypeAdapters montados uma única vez, gerando o JSON direto
+    em bytes. A saída é idêntica à do caminho padrão (response_model).
+    """
+
+    def __init__(self, modelo, schema):
+        self.schema = schema
+        self.campos = list(schema.model_fields)
+        self.colunas = [getattr(modelo, nome) for nome in self.campos]
+        self._item = TypeAdapter(schema)
+        self._pagina = TypeAdapter(schemas.Pagina[schema])
+
+    def query(self, db: Session) -> Query:
+        return db.query(*self.colunas)
+
+    def _como_dict(self, linha) -> dict:
+        # As colunas seguem a ordem dos campos; validar a partir de um dict
+        # é bem mais barato que from_attributes sobre a Row.
+        return dict(zip(self.campos, linha))
+
+    def item(self, linha) -> Response:
+        return self._resposta(self._item, self._como_dict(linha))
+
+    def pagina(self, dados: dict) -> Response:
+        itens = [self._como_dict(linha) for linha in dados["itens"]]
+        return self._resposta(self._pagina, {"itens": itens, "next": dados["next"]})
+
+    @staticmethod
+    def _resposta(adapter: TypeAdapter, dados) -> Response:
+        validado = adapter.validate_python(dados)
+        return Response(content=adapter.dump_json(validado), media_type="application/json")
+
+
+pacientes = SerializadorRapido(models.Paciente, schemas.PacienteOut)
+profissionais = SerializadorRapido(models.Profissional, schemas.ProfissionalOut)
+consultas = SerializadorRapido(models.Consulta, schemas.ConsultaOut)
@@ -0,0 +1,92 @@
+"""
+Compara dois resultados de benchmark (ex.: antes/depois de um commit).
+
+Uso:
+    python -m benchmarks.comparar antes.json depois.json --tolerancia 10
+
+Sai com código 1 se o p95 de algum cenário piorar mais que a tolerância (%),
+se o número de erros de algum cenário aumentar ou se algum cenário da
+execução nova falhar na conferência de integridade (integridade_ok).
+"""
+import argparse
+import json
+import sys
+
+METRICAS = (
+    ("latencia_ms", "p50"),
+    ("latencia_ms", "p95"),
+    ("latencia_ms", "p99"),
+    (None, "throughput_rps"),
+    (None, "rss_pico_mb"),
+)
+
+# Muda a cada dia e não afeta os volumes gerados
+CHAVES_IGNORADAS_DADOS = ("hoje",)
+
+
+def _valor(cenario: dict, grupo, chave):
+    return (cenario.get(grupo) or {}).get(chave) if grupo else cenario.get(chave)
+
+
+def _variacao(antes, depois):
+    if not antes:
+        return None
+    return (depois - antes) / antes * 100
+
+
+def _volumes(resultado: dict) -> dict:
+    dados = resultado.get("dados") or {}
+    return {k: v for k, v in dados.items() if k not in CHAVES_IGNORADAS_DADOS}
+
+
+def comparar(antes: dict, depois: dict, tolerancia: float) -> bool:
+    if _volumes(antes) != _volumes(depois):
+        print("Atenção: os resultados foram gerados com volumes de dados diferentes.")
+
+    print(f"antes:  {antes.get('commit')}  ({antes.get('data')})")
+    print(f"depois: {depois.get('commit')}  ({depois.get('data')})\n")
+
+    ok = True
+    for nome in sorted(set(antes["cenarios"]) & set(depois["cenarios"])):
+        print(nome)
+        for grupo, chave in METRICAS:
+            a = _valor(antes["cenarios"][nome], grupo, chave)
+            d = _valor(depois["cenarios"][nome], grupo, chave)
+            if a is None or d is None:
+                continue
+            variacao = _variacao(a, d)
+            texto = f"{variacao:+.1f}%" if variacao is not None else "n/a"
+            print(f"  {chave:>15}: {a:>10} -> {d:>10}  ({texto})")
+            if chave == "p95" and variacao is not None and variacao > tolerancia:
+                ok = False
+
+        a = antes["cenarios"][nome].get("erros")
+        d = depois["cenarios"][nome].get("erros")
+        if a is not None and d is not None:
+            print(f"  {'erros':>15}: {a:>10} -> {d:>10}")
+            if d > a:
+                ok = False
+
+    for nome, cenario in sorted(depois["cenarios"].items()):
+        if cenario.get("integridade_ok") is False:
+            print(f"\nFALHA: {nome} não passou na conferência de integridade")
+            ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark.")
+    parser.add_argument("antes")
+    parser.add_argument("depois")
+    parser.add_argument("--tolerancia", type=float, default=10.0, help="piora máxima aceita no p95 (%%)")
+    args = parser.parse_args()
+
+    with open(args.antes) as f:
+        antes = json.load(f)
+    with open(args.depois) as f:
+        depois = json.load(f)
+    sys.exit(0 if comparar(antes, depois, args.tolerancia) else 1)
+
+
+if __name__ == "__main__":
+    main()
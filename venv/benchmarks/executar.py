@@ -0,0 +1,346 @@
+"""
+Executa os cenários de benchmark com a aplicação em processo (TestClient)
+sobre um banco SQLite sintético e grava o resultado em JSON.
+
+Uso:
+    python -m benchmarks.executar --preset rapido --saida resultado.json
+    python -m benchmarks.comparar antes.json depois.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from .gerador import NOMES, PRESETS, SENHA_BENCH, SOBRENOMES, gerar
+
+VERSAO_FORMATO = 1
+
+
+# --------- Coleta ---------
+
+class Amostras:
+    def __init__(self):
+        self.latencias = []
+        self.status = Counter()
+        self._lock = threading.Lock()
+
+    def medir(self, funcao):
+        inicio = time.perf_counter()
+        resposta = funcao()
+        duracao = time.perf_counter() - inicio
+        with self._lock:
+            self.latencias.append(duracao)
+            self.status[resposta.status_code] += 1
+        return resposta
+
+
+def _percentil(ordenadas, p):
+    if not ordenadas:
+        return 0.0
+    indice = max(0, min(len(ordenadas) - 1, int(round(p / 100 * len(ordenadas) + 0.5)) - 1))
+    return ordenadas[indice]
+
+
+def _rss_pico_mb() -> float:
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return round(pico / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _resumo(amostras: Amostras, duracao: float, esperados=(200,)) -> dict:
+    ordenadas = sorted(amostras.latencias)
+    total = len(ordenadas)
+    return {
+        "requisicoes": total,
+        "erros": sum(n for codigo, n in amostras.status.items() if codigo not in esperados),
+        "status": {str(codigo): n for codigo, n in sorted(amostras.status.items())},
+        "duracao_s": round(duracao, 4),
+        "throughput_rps": round(total / duracao, 2) if duracao else 0.0,
+        "latencia_ms": {
+            "p50": round(_percentil(ordenadas, 50) * 1000, 3),
+            "p95": round(_percentil(ordenadas, 95) * 1000, 3),
+            "p99": round(_percentil(ordenadas, 99) * 1000, 3),
+            "media": round(sum(ordenadas) / total * 1000, 3) if total else 0.0,
+            "max": round(ordenadas[-1] * 1000, 3) if total else 0.0,
+        },
+        "rss_pico_mb": _rss_pico_mb(),
+    }
+
+
+def _rodar(cenario, iteracoes: int, aquecimento: int, esperados=(200,)) -> dict:
+    for i in range(aquecimento):
+        cenario(Amostras(), i)
+    amostras = Amostras()
+    inicio = time.perf_counter()
+    for i in range(iteracoes):
+        cenario(amostras, i)
+    return _resumo(amostras, time.perf_counter() - inicio, esperados)
+
+
+# --------- Cenários ---------
+
+def cenario_login(cliente):
+    def executar(amostras, _):
+        amostras.medir(lambda: cliente.post(
+            "/auth/login",
+            data={"username": "atendente@bench.local", "password": SENHA_BENCH},
+        ))
+    return executar
+
+
+def cenario_listar_pacientes(cliente, cabecalhos):
+    def executar(amostras, _):
+        amostras.medir(lambda: cliente.get("/pacientes/", params={"limite": 100}, headers=cabecalhos))
+    return executar
+
+
+def cenario_buscar_pacientes(cliente, cabecalhos, rng):
+    def executar(amostras, _):
+        termo = rng.choice((
+            rng.choice(NOMES)[:3],
+            f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)[:4]}",
+            f"{rng.randrange(1000):03d}",
+        ))
+        amostras.medir(lambda: cliente.get("/pacientes/busca", params={"q": termo}, headers=cabecalhos))
+    return executar
+
+
+def cenario_listar_consultas_profissional(cliente, cabecalhos, rng, profissionais):
+    def executar(amostras, _):
+        params = {"profissional_id": rng.randrange(profissionais) + 1, "limite": 50}
+        amostras.medir(lambda: cliente.get("/consultas/", params=params, headers=cabecalhos))
+    return executar
+
+
+def cenario_listar_consultas_status(cliente, cabecalhos):
+    def executar(amostras, _):
+        params = {"status_consulta": "AGENDADA", "limite": 100}
+        amostras.medir(lambda: cliente.get("/consultas/", params=params, headers=cabecalhos))
+    return executar
+
+
+def cenario_relatorio_agenda(cliente, cabecalhos, rng, profissionais):
+    def executar(amostras, i):
+        hoje = datetime.utcnow().date()
+        params = {"de": (hoje - timedelta(days=30)).isoformat(), "ate": (hoje + timedelta(days=30)).isoformat()}
+        # metade das chamadas filtra um profissional, metade pega a clínica toda
+        if i % 2:
+            params["profissional_id"] = rng.randrange(profissionais) + 1
+        amostras.medir(lambda: cliente.get("/relatorios/agenda", params=params, headers=cabecalhos))
+    return executar
+
+
+def cenario_cancelar(cliente, cabecalhos, ids):
+    def executar(amostras, i):
+        consulta_id = ids[i % len(ids)]
+        amostras.medir(lambda: cliente.put(f"/consultas/{consulta_id}/cancelar", headers=cabecalhos))
+    return executar
+
+
+def _sobreposicoes(profissional_id: int, de: datetime, ate: datetime) -> int:
+    """
+    Conta, direto no banco, consultas AGENDADAS do profissional que se
+    sobrepõem a alguma anterior no período.
+    """
+    from app import database
+    from app.agenda import consultas_agendadas, fim_da_consulta
+
+    db = database.SessionLocal()
+    try:
+        consultas = sorted(
+            consultas_agendadas(db, [profissional_id], de, ate), key=lambda c: c.data_hora
+        )
+    finally:
+        db.close()
+    sobrepostas = 0
+    fim_anterior = None
+    for consulta in consultas:
+        if fim_anterior is not None and consulta.data_hora < fim_anterior:
+            sobrepostas += 1
+        fim = fim_da_consulta(consulta)
+        fim_anterior = fim if fim_anterior is None else max(fim_anterior, fim)
+    return sobrepostas
+
+
+def agendar_sob_contencao(app, cabecalhos, rng, threads: int, tentativas: int, pacientes: int) -> dict:
+    """
+    Várias threads tentam agendar os mesmos horários do mesmo profissional.
+    Mede latência e confere no banco que nenhuma consulta ficou sobreposta.
+    Os horários disputados são no máximo metade das tentativas, para que
+    haja disputa mesmo com poucas threads/tentativas.
+    """
+    from fastapi.testclient import TestClient
+
+    dia = datetime.combine(datetime.utcnow().date() + timedelta(days=900), datetime.min.time())
+    quantidade = max(1, min(20, threads * tentativas // 2))
+    horarios = [dia + timedelta(hours=8, minutes=30 * s) for s in range(quantidade)]
+    planos = [
+        [(rng.choice(horarios), rng.randrange(pacientes) + 1) for _ in range(tentativas)]
+        for _ in range(threads)
+    ]
+    amostras = Amostras()
+
+    def trabalhador(plano):
+        with TestClient(app) as cliente:
+            for data_hora, paciente_id in plano:
+                amostras.medir(lambda: cliente.post("/consultas/", json={
+                    "paciente_id": paciente_id,
+                    "profissional_id": 1,
+                    "data_hora": data_hora.isoformat(),
+                }, headers=cabecalhos))
+
+    inicio = time.perf_counter()
+    workers = [threading.Thread(target=trabalhador, args=(p,)) for p in planos]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    resumo = _resumo(amostras, time.perf_counter() - inicio, esperados=(201, 400))
+    resumo["agendadas"] = amostras.status.get(201, 0)
+    resumo["horarios_disputados"] = len(horarios)
+    resumo["sobreposicoes"] = _sobreposicoes(1, dia, dia + timedelta(days=1))
+    resumo["integridade_ok"] = resumo["sobreposicoes"] == 0
+    return resumo
+
+
+# --------- Execução ---------
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(args) -> dict:
+    volumes = dict(PRESETS[args.preset])
+    for chave in volumes:
+        if getattr(args, chave) is not None:
+            volumes[chave] = getattr(args, chave)
+
+    # Cada execução roda sobre uma cópia do banco gerado, para ser reprodutível
+    copia = args.db + ".execucao"
+    os.environ["SGHSS_DATABASE_URL"] = f"sqlite:///{copia}"
+    dados = gerar(args.db, semente=args.semente, **volumes)
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(copia + sufixo):
+            os.remove(copia + sufixo)
+    shutil.copyfile(args.db, copia)
+
+    from fastapi.testclient import TestClient
+    from app import config, database, models
+    from app.main import app
+
+    rng = random.Random(args.semente)
+    resultado = {
+        "versao": VERSAO_FORMATO,
+        "commit": _commit_atual(),
+        "data": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "dados": dados,
+        "parametros": {
+            "iteracoes": args.iteracoes,
+            "aquecimento": args.aquecimento,
+            "threads": args.threads,
+            "metrics_enabled": config.METRICS_ENABLED,
+        },
+        "cenarios": {},
+    }
+    cenarios = resultado["cenarios"]
+
+    with TestClient(app) as cliente:
+        cenarios["login"] = _rodar(cenario_login(cliente), args.iteracoes, args.aquecimento)
+
+        token = cliente.post(
+            "/auth/login",
+            data={"username": "atendente@bench.local", "password": SENHA_BENCH},
+        ).json()["access_token"]
+        cabecalhos = {"Authorization": f"Bearer {token}"}
+
+        cenarios["listar_pacientes"] = _rodar(
+            cenario_listar_pacientes(cliente, cabecalhos), args.iteracoes, args.aquecimento
+        )
+        cenarios["buscar_pacientes"] = _rodar(
+            cenario_buscar_pacientes(cliente, cabecalhos, rng), args.iteracoes, args.aquecimento
+        )
+        cenarios["listar_consultas_profissional"] = _rodar(
+            cenario_listar_consultas_profissional(cliente, cabecalhos, rng, volumes["profissionais"]),
+            args.iteracoes, args.aquecimento,
+        )
+        cenarios["listar_consultas_status"] = _rodar(
+            cenario_listar_consultas_status(cliente, cabecalhos), args.iteracoes, args.aquecimento
+        )
+
+        token_admin = cliente.post(
+            "/auth/login",
+            data={"username": "admin@bench.local", "password": SENHA_BENCH},
+        ).json()["access_token"]
+        cenarios["relatorio_agenda"] = _rodar(
+            cenario_relatorio_agenda(
+                cliente, {"Authorization": f"Bearer {token_admin}"}, rng, volumes["profissionais"]
+            ),
+            args.iteracoes, args.aquecimento,
+        )
+
+        db = database.SessionLocal()
+        try:
+            ids = [
+                cid for (cid,) in db.query(models.Consulta.id).filter(
+                    models.Consulta.status == models.StatusConsultaEnum.AGENDADA,
+                    models.Consulta.data_hora > datetime.utcnow() + timedelta(days=1),
+                ).order_by(models.Consulta.id).limit(args.iteracoes + args.aquecimento)
+            ]
+        finally:
+            db.close()
+        rng.shuffle(ids)
+        if ids:
+            cenarios["cancelar"] = _rodar(
+                cenario_cancelar(cliente, cabecalhos, ids), min(args.iteracoes, len(ids)), 0
+            )
+
+    cenarios["agendar_contencao"] = agendar_sob_contencao(
+        app, cabecalhos, rng, args.threads, args.tentativas, volumes["pacientes"]
+    )
+    resultado["rss_pico_mb"] = _rss_pico_mb()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks da API SGHSS.")
+    parser.add_argument("--db", default="/tmp/sghss_bench.db")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="rapido")
+    parser.add_argument("--pacientes", type=int)
+    parser.add_argument("--profissionais", type=int)
+    parser.add_argument("--consultas", type=int)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--iteracoes", type=int, default=200)
+    parser.add_argument("--aquecimento", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--tentativas", type=int, default=10, help="agendamentos por thread")
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    resultado = executar(args)
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
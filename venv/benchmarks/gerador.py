@@ -0,0 +1,188 @@
+"""
+Gerador determinístico (por semente) de dados sintéticos para os benchmarks.
+
+Uso:
+    python -m benchmarks.gerador --db /tmp/sghss_bench.db --preset completo
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+
+PRESETS = {
+    # Volumes de uma clínica grande
+    "completo": {"pacientes": 100_000, "profissionais": 2_000, "consultas": 1_000_000},
+    # Para rodar em poucos segundos (CI, comparação rápida entre commits)
+    "rapido": {"pacientes": 5_000, "profissionais": 100, "consultas": 50_000},
+}
+
+SENHA_BENCH = "bench123"
+USUARIOS_BENCH = (
+    ("admin@bench.local", "ADMIN"),
+    ("atendente@bench.local", "ATENDENTE"),
+    ("medico@bench.local", "MEDICO"),
+)
+
+TAMANHO_LOTE = 10_000
+SLOTS_POR_DIA = 20  # 08:00 às 18:00, de 30 em 30 minutos
+DIAS_NO_PASSADO = 180
+
+NOMES = ("Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Hugo", "Íris", "João",
+         "Karina", "Lucas", "Marina", "Nicolas", "Otávio", "Paula", "Rafael", "Sofia", "Tiago", "Vitória")
+SOBRENOMES = ("Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Ferreira", "Costa",
+              "Rodrigues", "Almeida", "Nascimento", "Araújo", "Gonçalves", "Ribeiro", "Conceição")
+ESPECIALIDADES = ("Clínica Geral", "Cardiologia", "Pediatria", "Ortopedia", "Dermatologia",
+                  "Ginecologia", "Neurologia", "Psiquiatria", "Oftalmologia", "Endocrinologia")
+
+
+def _nome(rng: random.Random) -> str:
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+
+def _em_lotes(linhas, tamanho=TAMANHO_LOTE):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _pacientes(rng: random.Random, total: int):
+    for i in range(total):
+        yield {
+            "nome": _nome(rng),
+            "cpf": f"{i + 1:011d}",
+            "data_nascimento": datetime(1940, 1, 1).date() + timedelta(days=rng.randrange(30_000)),
+            "telefone": f"119{rng.randrange(10**8):08d}",
+            "email": None,
+            "endereco": None,
+            "dados_clinicos_resumidos": None,
+            "ativo": rng.random() > 0.02,
+        }
+
+
+def _profissionais(rng: random.Random, total: int):
+    for i in range(total):
+        yield {
+            "nome": _nome(rng),
+            "documento_registro": f"CRM-{i + 1:06d}",
+            "especialidade": ESPECIALIDADES[i % len(ESPECIALIDADES)],
+            "email": None,
+            "telefone": None,
+            "ativo": True,
+        }
+
+
+def _consultas(rng: random.Random, total: int, pacientes: int, profissionais: int, hoje: datetime):
+    """
+    Distribui as consultas em uma grade de 30 minutos por profissional,
+    sem sobreposição, metade no passado e metade no futuro.
+    """
+    slots_por_prof = -(-total // profissionais)
+    dias = -(-slots_por_prof // SLOTS_POR_DIA)
+    inicio = hoje - timedelta(days=min(DIAS_NO_PASSADO, dias // 2))
+    criado_em = inicio - timedelta(days=30)
+    for i in range(total):
+        slot = i // profissionais
+        data_hora = (
+            inicio
+            + timedelta(days=slot // SLOTS_POR_DIA)
+            + timedelta(hours=8, minutes=30 * (slot % SLOTS_POR_DIA))
+        )
+        if data_hora < hoje:
+            status = "CANCELADA" if rng.random() < 0.15 else "REALIZADA"
+        else:
+            status = "CANCELADA" if rng.random() < 0.10 else "AGENDADA"
+        yield {
+            "paciente_id": rng.randrange(pacientes) + 1,
+            "profissional_id": i % profissionais + 1,
+            "data_hora": data_hora,
+            "duracao_minutos": 30,
+            "status": status,
+            "observacoes": None,
+            "criado_em": criado_em,
+        }
+
+
+def gerar(db_path: str, pacientes: int, profissionais: int, consultas: int, semente: int = 42) -> dict:
+    """
+    Cria (ou recria) o banco SQLite em `db_path` com os volumes pedidos.
+    Se já existir um banco gerado com os mesmos parâmetros, reaproveita.
+    """
+    from app import busca, config, models, relatorios, senhas
+
+    parametros = {
+        "pacientes": pacientes,
+        "profissionais": profissionais,
+        "consultas": consultas,
+        "semente": semente,
+        "bcrypt_rounds": config.BCRYPT_ROUNDS,
+        "hoje": datetime.utcnow().date().isoformat(),
+    }
+    meta_path = db_path + ".json"
+    if os.path.exists(db_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f) == parametros:
+                return parametros
+    for caminho in (db_path, meta_path):
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+    rng = random.Random(semente)
+    hoje = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    engine = create_engine(f"sqlite:///{db_path}")
+    models.Base.metadata.create_all(bind=engine)
+
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        senha_hash = senhas.calcular_hash(SENHA_BENCH, config.BCRYPT_ROUNDS)
+        conn.execute(insert(models.Usuario), [
+            {"email": email, "senha_hash": senha_hash, "role": role, "ativo": True}
+            for email, role in USUARIOS_BENCH
+        ])
+        for lote in _em_lotes(_pacientes(rng, pacientes)):
+            conn.execute(insert(models.Paciente), lote)
+        for lote in _em_lotes(_profissionais(rng, profissionais)):
+            conn.execute(insert(models.Profissional), lote)
+        for lote in _em_lotes(_consultas(rng, consultas, pacientes, profissionais, hoje)):
+            conn.execute(insert(models.Consulta), lote)
+        # Índice de busca já pronto no arquivo, para não ser reconstruído a cada execução
+        busca.criar_indice(engine.dialect.name, config.BUSCA_BACKEND).preparar(conn)
+        relatorios.reconstruir(conn)
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+
+    with open(meta_path, "w") as f:
+        json.dump(parametros, f)
+    print(f"Banco gerado em {time.perf_counter() - inicio:.1f}s: {db_path}")
+    return parametros
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o banco sintético dos benchmarks.")
+    parser.add_argument("--db", default="/tmp/sghss_bench.db")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="rapido")
+    parser.add_argument("--pacientes", type=int)
+    parser.add_argument("--profissionais", type=int)
+    parser.add_argument("--consultas", type=int)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+    os.environ.setdefault("SGHSS_DATABASE_URL", f"sqlite:///{args.db}")
+
+    volumes = dict(PRESETS[args.preset])
+    for chave in volumes:
+        if getattr(args, chave) is not None:
+            volumes[chave] = getattr(args, chave)
+    gerar(args.db, semente=args.semente, **volumes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compara o caminho padrão (ORM + response_model) com o caminho rápido
+(`rapido=true`) das rotas de leitura: custo por linha e igualdade da saída.
+
+Uso:
+    python -m benchmarks.serializacao --preset rapido --saida serializacao.json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from .gerador import PRESETS, SENHA_BENCH, gerar
+
+ROTAS = ("/pacientes/", "/profissionais/", "/consultas/")
+
+
+def _medir(cliente, rota, params, cabecalhos, iteracoes):
+    tempos = []
+    corpo = None
+    for _ in range(iteracoes):
+        inicio = time.perf_counter()
+        resposta = cliente.get(rota, params=params, headers=cabecalhos)
+        tempos.append(time.perf_counter() - inicio)
+        assert resposta.status_code == 200, resposta.text
+        corpo = resposta.content
+    return statistics.median(tempos), corpo
+
+
+def executar(args) -> dict:
+    volumes = dict(PRESETS[args.preset])
+    os.environ["SGHSS_DATABASE_URL"] = f"sqlite:///{args.db}"
+    dados = gerar(args.db, semente=args.semente, **volumes)
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    resultado = {"dados": dados, "limite": args.limite, "iteracoes": args.iteracoes, "rotas": {}}
+    with TestClient(app) as cliente:
+        token = cliente.post(
+            "/auth/login",
+            data={"username": "atendente@bench.local", "password": SENHA_BENCH},
+        ).json()["access_token"]
+        cabecalhos = {"Authorization": f"Bearer {token}"}
+
+        for rota in ROTAS:
+            params = {"limite": args.limite}
+            # aquecimento dos dois caminhos
+            _medir(cliente, rota, params, cabecalhos, 3)
+            _medir(cliente, rota, {**params, "rapido": True}, cabecalhos, 3)
+
+            padrao, corpo_padrao = _medir(cliente, rota, params, cabecalhos, args.iteracoes)
+            rapido, corpo_rapido = _medir(
+                cliente, rota, {**params, "rapido": True}, cabecalhos, args.iteracoes
+            )
+            linhas = len(json.loads(corpo_padrao)["itens"]) or 1
+            resultado["rotas"][rota] = {
+                "linhas": linhas,
+                "saida_identica": corpo_padrao == corpo_rapido,
+                "padrao_ms": round(padrao * 1000, 3),
+                "rapido_ms": round(rapido * 1000, 3),
+                "padrao_us_por_linha": round(padrao / linhas * 1e6, 2),
+                "rapido_us_por_linha": round(rapido / linhas * 1e6, 2),
+                "reducao_pct": round((1 - rapido / padrao) * 100, 1),
+            }
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do caminho rápido de serialização.")
+    parser.add_argument("--db", default="/tmp/sghss_bench.db")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="rapido")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--limite", type=int, default=1000)
+    parser.add_argument("--iteracoes", type=int, default=30)
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    resultado = executar(args)
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Os testes rodam sobre um SQLite temporário: as variáveis de ambiente
+precisam estar definidas antes do primeiro import do app.
+"""
+import os
+import tempfile
+
+_PASTA = tempfile.mkdtemp(prefix="sghss-testes-")
+os.environ["SGHSS_DATABASE_URL"] = f"sqlite:///{os.path.join(_PASTA, 'testes.db')}"
+os.environ["SGHSS_METRICS_ENABLED"] = "false"
+os.environ["SGHSS_BCRYPT_ROUNDS"] = "4"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app import busca, models  # noqa: E402
+from app.auth import criar_access_token  # noqa: E402
+from app.cache import cache_principais  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def _limpar_banco():
+    with engine.begin() as conn:
+        for (email,) in conn.execute(select(models.Usuario.email)):
+            cache_principais.invalidar(email)
+        ids = list(conn.execute(select(models.Paciente.id)).scalars())
+        if ids:
+            busca.indice.remover(conn, ids)
+        for tabela in reversed(models.Base.metadata.sorted_tables):
+            conn.execute(tabela.delete())
+
+
+@pytest.fixture(autouse=True)
+def banco_limpo():
+    yield
+    _limpar_banco()
+
+
+@pytest.fixture
+def db():
+    sessao = SessionLocal()
+    try:
+        yield sessao
+    finally:
+        sessao.close()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def criar_usuario(db):
+    """
+    Cria o usuário direto no banco e devolve os cabeçalhos com o token
+    (sem passar pelo login, que usaria o pool de hash).
+    """
+    def criar(email: str, role: models.RoleEnum = models.RoleEnum.ADMIN) -> dict:
+        db.add(models.Usuario(email=email, senha_hash="nao-usada", role=role, ativo=True))
+        db.commit()
+        return {"Authorization": f"Bearer {criar_access_token({'sub': email})}"}
+    return criar
+
+
+@pytest.fixture
+def criar_profissional(db):
+    def criar(**campos) -> models.Profissional:
+        sequencia = db.query(models.Profissional).count() + 1
+        profissional = models.Profissional(**{
+            "nome": f"Profissional {sequencia}",
+            "documento_registro": f"CRM-{sequencia}",
+            "especialidade": "Clínica geral",
+            "email": f"prof{sequencia}@teste.com",
+            "telefone": "11999990000",
+            **campos,
+        })
+        db.add(profissional)
+        db.commit()
+        return profissional
+    return criar
+
+
+@pytest.fixture
+def paciente(db) -> models.Paciente:
+    paciente = models.Paciente(nome="Paciente Teste", cpf="12345678901", telefone="11988887777")
+    db.add(paciente)
+    db.commit()
+    return paciente
@@ -0,0 +1,180 @@
+import json
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app import models
+from app.agenda import DURACAO_MAXIMA_MINUTOS, buscar_conflito
+
+# Um dia futuro qualquer, para não esbarrar em regras de horário passado
+DIA = date.today() + timedelta(days=30)
+
+
+def as_(hora: int, minuto: int = 0) -> datetime:
+    return datetime.combine(DIA, time(hora, minuto))
+
+
+def _agendar(db, profissional, paciente, inicio, duracao=30, status=models.StatusConsultaEnum.AGENDADA):
+    consulta = models.Consulta(
+        paciente_id=paciente.id,
+        profissional_id=profissional.id,
+        data_hora=inicio,
+        duracao_minutos=duracao,
+        status=status,
+    )
+    db.add(consulta)
+    db.commit()
+    return consulta
+
+
+# --------- buscar_conflito ---------
+
+@pytest.mark.parametrize(
+    "inicio, duracao, conflita",
+    [
+        (as_(9, 30), 30, False),   # termina quando a existente começa
+        (as_(10, 30), 30, False),  # começa quando a existente termina
+        (as_(9, 45), 30, True),    # cobre o início
+        (as_(10, 15), 30, True),   # cobre o fim
+        (as_(10, 5), 10, True),    # dentro da existente
+        (as_(9, 0), 120, True),    # contém a existente
+        (as_(11, 0), 30, False),
+    ],
+)
+def test_buscar_conflito_sobreposicao_e_adjacencia(db, criar_profissional, paciente, inicio, duracao, conflita):
+    profissional = criar_profissional()
+    existente = _agendar(db, profissional, paciente, as_(10, 0))
+
+    conflito = buscar_conflito(db, profissional.id, inicio, duracao)
+
+    assert (conflito is not None) == conflita
+    if conflita:
+        assert conflito.id == existente.id
+
+
+def test_buscar_conflito_consulta_longa_iniciada_antes(db, criar_profissional, paciente):
+    profissional = criar_profissional()
+    _agendar(db, profissional, paciente, as_(8, 0), duracao=DURACAO_MAXIMA_MINUTOS)
+
+    assert buscar_conflito(db, profissional.id, as_(11, 30), 30) is not None
+    assert buscar_conflito(db, profissional.id, as_(12, 0), 30) is None
+
+
+def test_buscar_conflito_ignora_canceladas_e_outros_profissionais(db, criar_profissional, paciente):
+    profissional, outro = criar_profissional(), criar_profissional()
+    _agendar(db, profissional, paciente, as_(10, 0), status=models.StatusConsultaEnum.CANCELADA)
+    _agendar(db, outro, paciente, as_(10, 0))
+
+    assert buscar_conflito(db, profissional.id, as_(10, 0), 30) is None
+
+
+
+# --------- Rotas ---------
+
+def test_agendar_aceita_adjacente_e_recusa_sobreposta(client, criar_usuario, criar_profissional, paciente):
+    cabecalhos = criar_usuario("atendente@teste.com", models.RoleEnum.ATENDENTE)
+    profissional = criar_profissional()
+
+    def agendar(inicio):
+        return client.post("/consultas/", headers=cabecalhos, json={
+            "paciente_id": paciente.id,
+            "profissional_id": profissional.id,
+            "data_hora": inicio.isoformat(),
+            "duracao_minutos": 30,
+        })
+
+    assert agendar(as_(10, 0)).status_code == 201
+    assert agendar(as_(10, 30)).status_code == 201
+    resposta = agendar(as_(10, 15))
+    assert resposta.status_code == 400
+    assert resposta.json()["detail"] == "Profissional já possui consulta nesse horário"
+
+
+def test_disponibilidade_aceita_periodo_com_fuso(client, db, criar_usuario, criar_profissional, paciente):
+    cabecalhos = criar_usuario("admin@teste.com")
+    profissional = criar_profissional()
+    _agendar(db, profissional, paciente, as_(10, 0))
+    url = f"/profissionais/{profissional.id}/disponibilidade"
+
+    # 07:00-03:00 == 10:00 UTC; 10:00-03:00 == 13:00 UTC
+    resposta = client.get(url, headers=cabecalhos, params={
+        "de": f"{DIA.isoformat()}T07:00:00-03:00",
+        "ate": f"{DIA.isoformat()}T10:00:00-03:00",
+    })
+    sem_fuso = client.get(url, headers=cabecalhos, params={
+        "de": as_(10, 0).isoformat(),
+        "ate": as_(13, 0).isoformat(),
+    })
+
+    assert resposta.status_code == 200
+    assert resposta.json() == sem_fuso.json()
+    inicios = [h["inicio"] for h in resposta.json()["horarios"]]
+    assert as_(10, 0).isoformat() not in inicios
+    assert inicios[0] == as_(10, 30).isoformat()
+
+
+def test_disponibilidade_de_varios_profissionais_paginada(client, criar_usuario, criar_profissional):
+    cabecalhos = criar_usuario("admin@teste.com")
+    ids = [criar_profissional().id for _ in range(5)]
+    criar_profissional(especialidade="Cardiologia")
+    params = {
+        "de": as_(8, 0).isoformat(),
+        "ate": as_(9, 0).isoformat(),
+        "especialidade": "Clínica geral",
+        "limite": 2,
+    }
+
+    vistos = []
+    while True:
+        resposta = client.get("/profissionais/disponibilidade", headers=cabecalhos, params=params)
+        assert resposta.status_code == 200
+        pagina = resposta.json()
+        assert len(pagina["itens"]) <= 2
+        vistos += [item["profissional_id"] for item in pagina["itens"]]
+        if not pagina["next"]:
+            break
+        params["cursor"] = pagina["next"]
+
+    assert vistos == ids
+
+
+def test_agendar_com_fuso_grava_utc_e_confere_conflito(client, db, criar_usuario, criar_profissional, paciente):
+    cabecalhos = criar_usuario("atendente@teste.com", models.RoleEnum.ATENDENTE)
+    profissional = criar_profissional()
+    _agendar(db, profissional, paciente, as_(10, 0))
+
+    def agendar(data_hora):
+        return client.post("/consultas/", headers=cabecalhos, json={
+            "paciente_id": paciente.id,
+            "profissional_id": profissional.id,
+            "data_hora": data_hora,
+        })
+
+    assert agendar(f"{DIA.isoformat()}T10:15:00Z").status_code == 400
+    criada = agendar(f"{DIA.isoformat()}T07:30:00-03:00")
+    assert criada.status_code == 201
+    assert criada.json()["data_hora"] == as_(10, 30).isoformat()
+
+
+def test_importar_misturando_fuso_e_sem_fuso(client, db, criar_usuario, criar_profissional, paciente):
+    cabecalhos = criar_usuario("atendente@teste.com", models.RoleEnum.ATENDENTE)
+    profissional = criar_profissional()
+    linhas = [
+        {"paciente_id": paciente.id, "profissional_id": profissional.id, "data_hora": data_hora}
+        for data_hora in (
+            as_(9, 0).isoformat(),
+            f"{DIA.isoformat()}T09:15:00Z",  # sobrepõe a anterior
+            f"{DIA.isoformat()}T07:00:00-03:00",  # 10:00 UTC
+        )
+    ]
+
+    resposta = client.post(
+        "/consultas/bulk",
+        headers=cabecalhos,
+        content="\n".join(json.dumps(linha) for linha in linhas),
+    )
+
+    assert resposta.status_code == 200
+    assert [linha["status"] for linha in resposta.json()["linhas"]] == ["criado", "duplicado", "criado"]
+    gravadas = sorted(c.data_hora for c in db.query(models.Consulta))
+    assert gravadas == [as_(9, 0), as_(10, 0)]
@@ -0,0 +1,158 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app import busca, models
+from app.database import engine
+
+
+@pytest.fixture(params=["fts", "normalizado"])
+def indice(request):
+    """
+    Roda o teste com cada backend disponível no SQLite.
+    """
+    original = busca.indice
+    novo = busca.criar_indice("sqlite", request.param)
+    with engine.begin() as conn:
+        novo.preparar(conn)
+    busca.configurar_indice(novo)
+    yield novo
+    with engine.begin() as conn:
+        ids = list(conn.execute(select(models.Paciente.id)).scalars())
+        if ids:
+            novo.remover(conn, ids)
+    busca.configurar_indice(original)
+
+
+@pytest.fixture
+def cabecalhos(criar_usuario):
+    return criar_usuario("admin@teste.com")
+
+
+def _criar(client, cabecalhos, nome, cpf, telefone=None) -> int:
+    resposta = client.post("/pacientes/", headers=cabecalhos, json={
+        "nome": nome, "cpf": cpf, "telefone": telefone,
+    })
+    assert resposta.status_code in (200, 201)
+    return resposta.json()["id"]
+
+
+def _buscar(client, cabecalhos, q, **params) -> list:
+    resposta = client.get("/pacientes/busca", headers=cabecalhos, params={"q": q, **params})
+    assert resposta.status_code == 200
+    return [p["nome"] for p in resposta.json()]
+
+
+# --------- Normalização e ranking (sem banco) ---------
+
+def test_normalizar_remove_acentos_caixa_e_pontuacao():
+    assert busca.normalizar("  JOSÉ   da Conceição-Júnior ") == "jose da conceicao junior"
+    assert busca.somente_digitos("123.456.789-01") == "12345678901"
+
+
+def test_termo_numerico_e_textual():
+    assert busca.Termo("123.456").digitos == "123456"
+    assert busca.Termo("José Sil").palavras == ["jose", "sil"]
+    assert not busca.Termo("Ana 2").eh_numerico
+
+
+def test_pontuar_ordem_de_relevancia():
+    nome, cpf, telefone = "maria jose silva", "12345678901", "11987654321"
+
+    def pontos(*termos):
+        return [busca.pontuar(busca.Termo(t), nome, cpf, telefone) for t in termos]
+
+    # CPF exato > início do CPF > telefone > trecho
+    numericos = pontos("12345678901", "1234", "4321", "5678")
+    # início do nome > início de palavras do nome > trecho
+    textuais = pontos("maria jo", "jose sil", "ilva")
+
+    for ordem in (numericos, textuais):
+        assert ordem == sorted(ordem, reverse=True)
+        assert len(set(ordem)) == len(ordem)
+
+
+# --------- Busca pela rota, em cada backend ---------
+
+def test_busca_ignora_acentos_e_caixa(client, cabecalhos, indice):
+    _criar(client, cabecalhos, "José Conceição", "11111111111")
+    _criar(client, cabecalhos, "Ana Souza", "22222222222")
+
+    assert _buscar(client, cabecalhos, "jose conceicao") == ["José Conceição"]
+    assert _buscar(client, cabecalhos, "CONCEIÇÃO") == ["José Conceição"]
+    assert _buscar(client, cabecalhos, "sou") == ["Ana Souza"]
+
+
+def test_busca_ordena_por_relevancia(client, cabecalhos, indice):
+    _criar(client, cabecalhos, "Carla Silvana", "33333333333")   # trecho de palavra
+    _criar(client, cabecalhos, "Bruno Silva", "22222222222")     # início de palavra
+    _criar(client, cabecalhos, "Silvia Ramos", "11111111111")    # início do nome
+
+    assert _buscar(client, cabecalhos, "silv") == ["Silvia Ramos", "Bruno Silva", "Carla Silvana"]
+    assert _buscar(client, cabecalhos, "silv", limite=2) == ["Silvia Ramos", "Bruno Silva"]
+
+
+def test_busca_por_trechos_de_cpf_e_telefone(client, cabecalhos, indice):
+    _criar(client, cabecalhos, "Ana", "12345678901", "(11) 98888-7777")
+    _criar(client, cabecalhos, "Bruno", "98712345600", "(21) 3333-4444")
+
+    assert _buscar(client, cabecalhos, "123.456.789-01") == ["Ana"]
+    assert _buscar(client, cabecalhos, "123") == ["Ana", "Bruno"]  # prefixo de CPF primeiro
+    assert _buscar(client, cabecalhos, "8888-7777") == ["Ana"]
+    assert _buscar(client, cabecalhos, "44") == ["Bruno"]  # menos de 3 dígitos
+    assert _buscar(client, cabecalhos, "55555") == []
+
+
+def test_indice_acompanha_criacao_alteracao_e_inativacao(client, cabecalhos, indice):
+    paciente_id = _criar(client, cabecalhos, "Ana Souza", "11111111111")
+    assert _buscar(client, cabecalhos, "ana") == ["Ana Souza"]
+
+    resposta = client.put(f"/pacientes/{paciente_id}", headers=cabecalhos, json={
+        "nome": "Beatriz Lima", "cpf": "11111111111",
+    })
+    assert resposta.status_code == 200
+    assert _buscar(client, cabecalhos, "ana") == []
+    assert _buscar(client, cabecalhos, "beatriz") == ["Beatriz Lima"]
+
+    assert client.delete(f"/pacientes/{paciente_id}", headers=cabecalhos).status_code in (200, 204)
+    assert _buscar(client, cabecalhos, "beatriz") == []
+    assert _buscar(client, cabecalhos, "11111111111") == []
+
+
+def test_indice_acompanha_importacao_em_lote(client, cabecalhos, indice):
+    corpo = "\n".join(json.dumps(p) for p in [
+        {"nome": "Débora Nunes", "cpf": "11111111111", "telefone": "11911112222"},
+        {"nome": "Eduardo Reis", "cpf": "22222222222"},
+        {"nome": "Débora Duplicada", "cpf": "11111111111"},  # CPF repetido: não entra
+    ])
+    resposta = client.post("/pacientes/bulk", headers=cabecalhos, content=corpo)
+    assert resposta.json()["criados"] == 2
+
+    assert _buscar(client, cabecalhos, "debora") == ["Débora Nunes"]
+    assert _buscar(client, cabecalhos, "1111-2222") == ["Débora Nunes"]
+    assert _buscar(client, cabecalhos, "reis") == ["Eduardo Reis"]
+
+
+def test_reconstruir_popula_a_partir_dos_pacientes(db, indice):
+    db.add_all([
+        models.Paciente(nome="Fábio Costa", cpf="11111111111"),
+        models.Paciente(nome="Fabiana Inativa", cpf="22222222222", ativo=False),
+    ])
+    db.commit()
+    with engine.begin() as conn:
+        indice.remover(conn, list(conn.execute(select(models.Paciente.id)).scalars()))
+        assert indice.buscar(conn, "fab", 10) == []
+        indice.reconstruir(conn)
+        ids = indice.buscar(conn, "fab", 10)
+
+    assert [db.get(models.Paciente, i).nome for i in ids] == ["Fábio Costa"]
+
+
+def test_indice_incompleto_nao_instancia():
+    class SoPreparar(busca.IndiceBusca):
+        def preparar(self, conn):
+            pass
+
+    with pytest.raises(TypeError):
+        SoPreparar()
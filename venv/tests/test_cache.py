@@ -0,0 +1,146 @@
+import pytest
+
+from app import models
+from app.cache import (
+    BackendCache,
+    BackendCompartilhado,
+    CachePrincipais,
+    ClienteChaveValorLocal,
+    Principal,
+    cache_principais,
+)
+
+EMAIL = "admin@teste.com"
+RELATORIO = "/relatorios/agenda?de=2030-01-01&ate=2030-01-31"
+
+
+def _usuario(db):
+    return db.query(models.Usuario).filter(models.Usuario.email == EMAIL).one()
+
+
+def test_desativar_usuario_invalida_principal(client, db, criar_usuario):
+    cabecalhos = criar_usuario(EMAIL)
+    assert client.get(RELATORIO, headers=cabecalhos).status_code == 200
+    assert cache_principais.obter(EMAIL) is not None
+
+    _usuario(db).ativo = False
+    db.commit()
+
+    assert cache_principais.obter(EMAIL) is None
+    assert client.get(RELATORIO, headers=cabecalhos).status_code == 401
+
+
+def test_trocar_role_invalida_principal(client, db, criar_usuario):
+    cabecalhos = criar_usuario(EMAIL)
+    assert client.get(RELATORIO, headers=cabecalhos).status_code == 200
+
+    _usuario(db).role = models.RoleEnum.MEDICO
+    db.commit()
+
+    assert client.get(RELATORIO, headers=cabecalhos).status_code == 403
+
+
+def test_invalida_so_depois_do_commit(client, db, criar_usuario):
+    cabecalhos = criar_usuario(EMAIL)
+    assert client.get(RELATORIO, headers=cabecalhos).status_code == 200
+
+    _usuario(db).ativo = False
+    db.flush()
+    assert cache_principais.obter(EMAIL) is not None
+
+    db.rollback()
+    assert cache_principais.obter(EMAIL) is not None
+    assert client.get(RELATORIO, headers=cabecalhos).status_code == 200
+
+
+def test_remover_usuario_invalida_principal(client, db, criar_usuario):
+    cabecalhos = criar_usuario(EMAIL)
+    assert client.get(RELATORIO, headers=cabecalhos).status_code == 200
+
+    db.delete(_usuario(db))
+    db.commit()
+
+    assert client.get(RELATORIO, headers=cabecalhos).status_code == 401
+
+
+def test_gravacao_atrasada_nao_ressuscita_principal(db, criar_usuario):
+    criar_usuario(EMAIL)
+
+    # Leitura começou antes da desativação e só grava no cache depois dela
+    marca = cache_principais.marca(EMAIL)
+    usuario = _usuario(db)
+    lido = Principal.de_usuario(usuario)
+    usuario.ativo = False
+    db.commit()
+
+    cache_principais.gravar(EMAIL, lido, marca)
+    assert cache_principais.obter(EMAIL) is None
+
+
+# --------- Backend compartilhado entre workers ---------
+
+def _principal(ativo: bool = True) -> Principal:
+    return Principal(id=1, email=EMAIL, role=models.RoleEnum.ADMIN, ativo=ativo)
+
+
+def _dois_workers(cliente=None):
+    cliente = cliente or ClienteChaveValorLocal()
+    return (
+        CachePrincipais(BackendCompartilhado(cliente)),
+        CachePrincipais(BackendCompartilhado(cliente)),
+    )
+
+
+def test_compartilhado_invalidacao_de_outro_worker_bloqueia_gravacao_atrasada():
+    worker_a, worker_b = _dois_workers()
+
+    marca = worker_b.marca(EMAIL)  # B começa a ler o usuário no banco
+    worker_a.invalidar(EMAIL)      # A desativa o usuário e invalida
+    worker_b.gravar(EMAIL, _principal(ativo=True), marca)
+
+    assert worker_a.obter(EMAIL) is None
+    assert worker_b.obter(EMAIL) is None
+
+    # Uma leitura que começa depois da invalidação volta a gravar
+    worker_b.gravar(EMAIL, _principal(ativo=False), worker_b.marca(EMAIL))
+    assert worker_a.obter(EMAIL) == _principal(ativo=False)
+
+
+def test_compartilhado_invalidacao_entre_conferencia_e_gravacao():
+    class ClienteInterrompido(ClienteChaveValorLocal):
+        # Outro worker invalida logo antes do setex de B chegar ao servidor
+        ao_gravar = None
+
+        def setex(self, chave, ttl, valor):
+            if self.ao_gravar is not None:
+                self.ao_gravar()
+            super().setex(chave, ttl, valor)
+
+    cliente = ClienteInterrompido()
+    worker_a, worker_b = _dois_workers(cliente)
+    marca = worker_b.marca(EMAIL)
+    cliente.ao_gravar = lambda: worker_a.invalidar(EMAIL)
+
+    worker_b.gravar(EMAIL, _principal(), marca)
+
+    assert worker_a.obter(EMAIL) is None
+
+
+def test_compartilhado_limpar_preserva_geracoes():
+    worker_a, worker_b = _dois_workers()
+    marca = worker_b.marca(EMAIL)
+    worker_a.invalidar(EMAIL)
+    worker_a.limpar()
+
+    worker_b.gravar(EMAIL, _principal(), marca)
+
+    assert worker_a.obter(EMAIL) is None
+
+
+def test_backend_incompleto_nao_instancia():
+    class SoObter(BackendCache):
+        def obter(self, chave):
+            return None
+
+    with pytest.raises(TypeError):
+        SoObter()
@@ -0,0 +1,59 @@
+import copy
+
+import pytest
+
+from benchmarks.comparar import comparar
+
+RESULTADO = {
+    "commit": "abc",
+    "data": "2026-10-16T12:00:00",
+    "dados": {"pacientes": 100, "profissionais": 10, "consultas": 1000, "semente": 42, "hoje": "2026-10-16"},
+    "cenarios": {
+        "login": {"erros": 0, "latencia_ms": {"p50": 1.0, "p95": 2.0, "p99": 3.0}},
+        "agendar_contencao": {"erros": 0, "latencia_ms": {"p95": 5.0}, "integridade_ok": True},
+    },
+}
+
+
+@pytest.fixture
+def depois():
+    return copy.deepcopy(RESULTADO)
+
+
+def test_sem_mudancas(depois, capsys):
+    assert comparar(RESULTADO, depois, 10) is True
+    assert "volumes de dados diferentes" not in capsys.readouterr().out
+
+
+def test_dia_diferente_nao_muda_volumes(depois, capsys):
+    depois["dados"]["hoje"] = "2026-10-17"
+
+    assert comparar(RESULTADO, depois, 10) is True
+    assert "volumes de dados diferentes" not in capsys.readouterr().out
+
+
+def test_volumes_diferentes_avisam(depois, capsys):
+    depois["dados"]["pacientes"] = 200
+
+    comparar(RESULTADO, depois, 10)
+    assert "volumes de dados diferentes" in capsys.readouterr().out
+
+
+def test_p95_acima_da_tolerancia_falha(depois):
+    depois["cenarios"]["login"]["latencia_ms"]["p95"] = 2.5
+
+    assert comparar(RESULTADO, depois, 10) is False
+    assert comparar(RESULTADO, depois, 30) is True
+
+
+def test_aumento_de_erros_falha(depois):
+    depois["cenarios"]["login"]["erros"] = 1
+
+    assert comparar(RESULTADO, depois, 10) is False
+
+
+def test_falha_de_integridade_falha(depois, capsys):
+    depois["cenarios"]["agendar_contencao"]["integridade_ok"] = False
+
+    assert comparar(RESULTADO, depois, 10) is False
+    assert "agendar_contencao" in capsys.readouterr().out.split("FALHA")[-1]
@@ -0,0 +1,195 @@
+import asyncio
+import json
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.exc import OperationalError
+
+from app import busca, models
+from app.database import engine
+from app.importacao import importar, processar_lote_consultas
+
+CSV = "text/csv"
+
+
+def _importar(client, cabecalhos, corpo, content_type=None, **params):
+    resposta = client.post(
+        "/pacientes/bulk",
+        headers={**cabecalhos, **({"Content-Type": content_type} if content_type else {})},
+        params=params,
+        content=corpo,
+    )
+    assert resposta.status_code == 200
+    return resposta.json()
+
+
+def _em_pedacos(texto: str, tamanho: int = 7):
+    dados = texto.encode("utf-8")
+    return iter([dados[i:i + tamanho] for i in range(0, len(dados), tamanho)])
+
+
+# --------- Leitura do corpo ---------
+
+def test_csv_com_quebra_de_linha_entre_aspas(client, db, criar_usuario):
+    cabecalhos = criar_usuario("admin@teste.com")
+    corpo = (
+        'nome,cpf,endereco\r\n'
+        '"Ana ""Aninha"" Souza",11111111111,"Rua A\nApto 2"\r\n'
+        '\r\n'
+        'Bruno,22222222222,Rua B\r\n'
+    )
+
+    # Em pedaços pequenos, para o registro chegar dividido entre blocos
+    relatorio = _importar(client, cabecalhos, _em_pedacos(corpo), CSV)
+
+    assert [linha["status"] for linha in relatorio["linhas"]] == ["criado", "criado"]
+    enderecos = dict(db.query(models.Paciente.nome, models.Paciente.endereco))
+    assert enderecos == {'Ana "Aninha" Souza': "Rua A\nApto 2", "Bruno": "Rua B"}
+
+
+def test_csv_com_aspas_nao_fechadas(client, criar_usuario):
+    cabecalhos = criar_usuario("admin@teste.com")
+    corpo = 'nome,cpf,endereco\nAna,11111111111,Rua A\nBruno,22222222222,"Rua B\n'
+
+    relatorio = _importar(client, cabecalhos, corpo, CSV)
+
+    assert [linha["status"] for linha in relatorio["linhas"]] == ["criado", "invalido"]
+    assert relatorio["linhas"][1]["erro"].startswith("CSV inválido")
+
+
+def test_ndjson_com_linhas_invalidas(client, criar_usuario):
+    cabecalhos = criar_usuario("admin@teste.com")
+    corpo = "\n".join([
+        json.dumps({"nome": "Ana", "cpf": "11111111111"}),
+        "{nao e json",
+        "[1, 2]",
+        "",
+        json.dumps({"nome": "Bruno", "cpf": "22222222222"}),
+    ])
+
+    relatorio = _importar(client, cabecalhos, _em_pedacos(corpo))
+
+    assert [(linha["linha"], linha["status"]) for linha in relatorio["linhas"]] == [
+        (1, "criado"), (2, "invalido"), (3, "invalido"), (4, "criado"),
+    ]
+
+
+# --------- Travas entre trechos do corpo ---------
+
+class _CorpoEmTrechos:
+    """
+    Imita o Request: entre um trecho e outro do corpo, roda `enquanto_espera`
+    (o que outro cliente faria enquanto o upload ainda está chegando).
+    """
+
+    headers: dict = {}
+
+    def __init__(self, trechos, enquanto_espera):
+        self.trechos = trechos
+        self.enquanto_espera = enquanto_espera
+
+    async def stream(self):
+        for trecho in self.trechos:
+            yield trecho
+            self.enquanto_espera()
+
+
+def _outro_escritor_consegue(profissional_id: int) -> bool:
+    outro = create_engine(str(engine.url), connect_args={"timeout": 0.2})
+    try:
+        with outro.begin() as conn:
+            conn.execute(
+                update(models.Profissional)
+                .where(models.Profissional.id == profissional_id)
+                .values(telefone="11900000000")
+            )
+        return True
+    except OperationalError:
+        return False
+    finally:
+        outro.dispose()
+
+
+def _linha_consulta(paciente, profissional, data_hora: datetime) -> bytes:
+    return (json.dumps({
+        "paciente_id": paciente.id,
+        "profissional_id": profissional.id,
+        "data_hora": data_hora.isoformat(),
+    }) + "\n").encode()
+
+
+@pytest.mark.parametrize("atomico", [False, True])
+def test_lote_nao_prende_travas_esperando_o_corpo(db, criar_profissional, paciente, atomico):
+    profissional = criar_profissional()
+    inicio = datetime.combine(date.today() + timedelta(days=30), time(9))
+    db.add(models.Consulta(paciente_id=paciente.id, profissional_id=profissional.id, data_hora=inicio))
+    db.commit()
+
+    # Primeiro lote só com conflito (nada a inserir), segundo com uma consulta nova
+    resultados = []
+    corpo = _CorpoEmTrechos(
+        [
+            _linha_consulta(paciente, profissional, inicio),
+            _linha_consulta(paciente, profissional, inicio + timedelta(hours=1)),
+        ],
+        lambda: resultados.append(_outro_escritor_consegue(profissional.id)),
+    )
+
+    relatorio = asyncio.run(importar(corpo, db, processar_lote_consultas, 1, atomico))
+
+    assert all(resultados) and resultados
+    assert [linha["status"] for linha in relatorio["linhas"]] == [
+        "duplicado", "revertido" if atomico else "criado",
+    ]
+
+
+# --------- Recusa do banco ---------
+
+@pytest.fixture
+def banco_recusa_nome():
+    """
+    Trigger que faz o banco recusar pacientes chamados "Recusado", como
+    faria um CPF gravado por outra requisição depois da verificação.
+    """
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TRIGGER recusar_nome BEFORE INSERT ON pacientes "
+            "WHEN NEW.nome = 'Recusado' BEGIN SELECT RAISE(ABORT, 'nome recusado'); END"
+        )
+    yield
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TRIGGER recusar_nome")
+    # Conexões do pool guardam o esquema em cache; as próximas relêem
+    engine.dispose()
+
+
+def _pacientes_ndjson(*nomes) -> str:
+    return "\n".join(
+        json.dumps({"nome": nome, "cpf": f"{i:011d}"}) for i, nome in enumerate(nomes, start=1)
+    )
+
+
+def test_lote_recusado_refeito_linha_a_linha(client, db, criar_usuario, banco_recusa_nome):
+    cabecalhos = criar_usuario("admin@teste.com")
+
+    relatorio = _importar(client, cabecalhos, _pacientes_ndjson("Ana", "Recusado", "Bruno"))
+
+    assert [linha["status"] for linha in relatorio["linhas"]] == ["criado", "invalido", "criado"]
+    assert relatorio["linhas"][1]["erro"] == "Recusado pelo banco: nome recusado"
+    assert sorted(nome for (nome,) in db.query(models.Paciente.nome)) == ["Ana", "Bruno"]
+    with engine.connect() as conn:
+        assert len(busca.indice.buscar(conn, "Bruno", 10)) == 1
+
+
+def test_lote_recusado_em_modo_atomico_nao_grava_nada(client, db, criar_usuario, banco_recusa_nome):
+    cabecalhos = criar_usuario("admin@teste.com")
+    corpo = _pacientes_ndjson("Ana", "Bruno", "Recusado", "Carla")
+
+    relatorio = _importar(client, cabecalhos, corpo, atomico="true", tamanho_lote=2)
+
+    assert relatorio["confirmado"] is False
+    assert [linha["status"] for linha in relatorio["linhas"]] == [
+        "revertido", "revertido", "invalido", "revertido",
+    ]
+    assert db.query(models.Paciente).count() == 0
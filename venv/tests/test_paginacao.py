@@ -0,0 +1,139 @@
+import base64
+import json
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app import models, paginacao
+from app.paginacao import NDJSON_MEDIA_TYPE, codificar_cursor, decodificar_cursor
+
+DIA = date.today() + timedelta(days=30)
+
+
+def _cursor_de(valores) -> str:
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip("=")
+
+
+@pytest.fixture
+def cabecalhos(criar_usuario):
+    return criar_usuario("admin@teste.com")
+
+
+@pytest.fixture
+def pacientes(db) -> list:
+    criados = [models.Paciente(nome=f"Paciente {i}", cpf=f"{i:011d}") for i in range(1, 8)]
+    criados.append(models.Paciente(nome="Inativo", cpf="99999999999", ativo=False))
+    db.add_all(criados)
+    db.commit()
+    return [p.id for p in criados if p.ativo]
+
+
+@pytest.fixture
+def consultas(db, criar_profissional, paciente) -> list:
+    """
+    Várias consultas no mesmo horário (profissionais diferentes), para a
+    ordem depender do desempate por id.
+    """
+    profissionais = [criar_profissional() for _ in range(4)]
+    horarios = [time(10), time(9), time(10), time(10), time(11), time(9)]
+    for i, horario in enumerate(horarios):
+        db.add(models.Consulta(
+            paciente_id=paciente.id,
+            profissional_id=profissionais[i % len(profissionais)].id,
+            data_hora=datetime.combine(DIA, horario),
+        ))
+    db.commit()
+    todas = db.query(models.Consulta).all()
+    return [c.id for c in sorted(todas, key=lambda c: (c.data_hora, c.id))]
+
+
+def _percorrer(client, cabecalhos, url, **params) -> list:
+    ids, paginas = [], 0
+    while True:
+        resposta = client.get(url, headers=cabecalhos, params=params)
+        assert resposta.status_code == 200
+        pagina = resposta.json()
+        ids += [item["id"] for item in pagina["itens"]]
+        paginas += 1
+        if not pagina["next"]:
+            return ids, paginas
+        params["cursor"] = pagina["next"]
+
+
+# --------- Cursor ---------
+
+def test_cursor_ida_e_volta_com_data_hora():
+    chaves = (models.Consulta.data_hora, models.Consulta.id)
+    valores = [datetime(2030, 1, 10, 9, 30), 42]
+
+    assert decodificar_cursor(codificar_cursor(valores), chaves) == valores
+
+
+@pytest.mark.parametrize("url, cursor", [
+    ("/pacientes/", "@@@"),
+    ("/pacientes/", _cursor_de({"id": 1})),      # não é lista
+    ("/pacientes/", _cursor_de([1, 2])),         # chaves demais
+    ("/pacientes/", _cursor_de(["1"])),          # id como texto
+    ("/pacientes/", _cursor_de([True])),         # bool não é id
+    ("/pacientes/", _cursor_de(["x"])),
+    ("/consultas/", _cursor_de([1, 1])),         # data_hora como número
+    ("/consultas/", _cursor_de(["ontem", 1])),   # data_hora inválida
+    ("/consultas/", _cursor_de(["2030-01-10T09:00:00", 1.5])),
+])
+def test_cursor_invalido_responde_400(client, cabecalhos, url, cursor):
+    resposta = client.get(url, headers=cabecalhos, params={"cursor": cursor})
+
+    assert resposta.status_code == 400
+    assert resposta.json()["detail"] == "Cursor inválido"
+
+
+# --------- Páginas ---------
+
+@pytest.mark.parametrize("rapido", [False, True])
+def test_percorre_pacientes_com_next(client, cabecalhos, pacientes, rapido):
+    ids, paginas = _percorrer(client, cabecalhos, "/pacientes/", limite=3, rapido=rapido)
+
+    assert ids == pacientes
+    assert paginas == 3
+
+
+def test_ultima_pagina_cheia_nao_tem_next(client, cabecalhos, pacientes):
+    resposta = client.get("/pacientes/", headers=cabecalhos, params={"limite": len(pacientes)})
+
+    assert resposta.json()["next"] is None
+    assert len(resposta.json()["itens"]) == len(pacientes)
+
+
+@pytest.mark.parametrize("rapido", [False, True])
+def test_consultas_desempatam_por_id(client, cabecalhos, consultas, rapido):
+    # Páginas de 2 cortam o grupo de consultas às 10h ao meio
+    ids, _ = _percorrer(client, cabecalhos, "/consultas/", limite=2, rapido=rapido)
+
+    assert ids == consultas
+
+
+# --------- Streaming NDJSON ---------
+
+def _ndjson(client, cabecalhos, url, **params) -> list:
+    resposta = client.get(url, headers={**cabecalhos, "Accept": NDJSON_MEDIA_TYPE}, params=params)
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+    return [json.loads(linha) for linha in resposta.text.splitlines()]
+
+
+def test_ndjson_devolve_todas_as_linhas_em_lotes(client, cabecalhos, consultas, monkeypatch):
+    monkeypatch.setattr(paginacao, "TAMANHO_LOTE_STREAM", 4)
+
+    linhas = _ndjson(client, cabecalhos, "/consultas/")
+
+    assert [linha["id"] for linha in linhas] == consultas
+    assert linhas[0]["data_hora"] == datetime.combine(DIA, time(9)).isoformat()
+
+
+def test_ndjson_continua_a_partir_do_cursor(client, cabecalhos, pacientes):
+    primeira = client.get("/pacientes/", headers=cabecalhos, params={"limite": 2}).json()
+
+    linhas = _ndjson(client, cabecalhos, "/pacientes/", cursor=primeira["next"])
+
+    assert [linha["id"] for linha in linhas] == pacientes[2:]
+    assert all(linha["ativo"] for linha in linhas)
@@ -0,0 +1,162 @@
+import json
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import delete
+
+from app import models, relatorios
+from app.database import SessionLocal, engine
+
+DIA = date.today() + timedelta(days=30)
+AGENDADA = models.StatusConsultaEnum.AGENDADA
+CANCELADA = models.StatusConsultaEnum.CANCELADA
+
+
+def as_(hora: int, minuto: int = 0, dia: date = DIA) -> str:
+    return datetime.combine(dia, time(hora, minuto)).isoformat()
+
+
+def _resumo(db) -> dict:
+    db.expire_all()
+    r = models.ResumoAgenda
+    return {
+        (pid, dia, status): quantidade
+        for pid, dia, status, quantidade in db.query(r.profissional_id, r.dia, r.status, r.quantidade)
+    }
+
+
+def _relatorio(client, cabecalhos, **params) -> dict:
+    resposta = client.get("/relatorios/agenda", headers=cabecalhos, params={
+        "de": DIA.isoformat(), "ate": (DIA + timedelta(days=1)).isoformat(), **params,
+    })
+    assert resposta.status_code == 200
+    return resposta.json()
+
+
+def _agendar(client, cabecalhos, paciente, profissional, inicio) -> dict:
+    resposta = client.post("/consultas/", headers=cabecalhos, json={
+        "paciente_id": paciente.id, "profissional_id": profissional.id, "data_hora": inicio,
+    })
+    assert resposta.status_code == 201
+    return resposta.json()
+
+
+def test_resumo_apos_agendar_e_cancelar(client, db, criar_usuario, criar_profissional, paciente):
+    cabecalhos = criar_usuario("admin@teste.com")
+    a, b = criar_profissional(), criar_profissional()
+    primeira = _agendar(client, cabecalhos, paciente, a, as_(9))
+    _agendar(client, cabecalhos, paciente, a, as_(10))
+    _agendar(client, cabecalhos, paciente, b, as_(9, dia=DIA + timedelta(days=1)))
+
+    assert client.put(f"/consultas/{primeira['id']}/cancelar", headers=cabecalhos).status_code == 200
+
+    assert _resumo(db) == {
+        (a.id, DIA, AGENDADA): 1,
+        (a.id, DIA, CANCELADA): 1,
+        (b.id, DIA + timedelta(days=1), AGENDADA): 1,
+    }
+    relatorio = _relatorio(client, cabecalhos)
+    assert relatorio["geral"] == {
+        "agendadas": 2, "canceladas": 1, "realizadas": 0, "total": 3, "taxa_cancelamento": 0.3333,
+    }
+    por_profissional = {p["profissional_id"]: p for p in relatorio["profissionais"]}
+    assert por_profissional[a.id]["taxa_cancelamento"] == 0.5
+    assert por_profissional[b.id]["total"] == 1
+    assert _relatorio(client, cabecalhos, profissional_id=b.id)["geral"]["total"] == 1
+
+
+def test_resumo_apos_importacao_em_lote(client, db, criar_usuario, criar_profissional, paciente):
+    cabecalhos = criar_usuario("admin@teste.com")
+    profissional = criar_profissional()
+    _agendar(client, cabecalhos, paciente, profissional, as_(9))
+
+    linhas = [
+        {"paciente_id": paciente.id, "profissional_id": profissional.id, "data_hora": as_(hora)}
+        for hora in (10, 11, 9)  # a última conflita com a já agendada
+    ]
+    resposta = client.post(
+        "/consultas/bulk",
+        headers=cabecalhos,
+        content="\n".join(json.dumps(linha) for linha in linhas),
+    )
+
+    assert resposta.status_code == 200
+    assert resposta.json()["criados"] == 2
+    assert _resumo(db) == {(profissional.id, DIA, AGENDADA): 3}
+
+
+def test_importacao_atomica_recusada_nao_conta(client, db, criar_usuario, criar_profissional, paciente):
+    cabecalhos = criar_usuario("admin@teste.com")
+    profissional = criar_profissional()
+    linhas = [
+        {"paciente_id": paciente.id, "profissional_id": profissional.id, "data_hora": as_(10)},
+        {"paciente_id": paciente.id, "profissional_id": 999, "data_hora": as_(11)},
+    ]
+    resposta = client.post(
+        "/consultas/bulk?atomico=true",
+        headers=cabecalhos,
+        content="\n".join(json.dumps(linha) for linha in linhas),
+    )
+
+    assert resposta.json()["confirmado"] is False
+    assert _resumo(db) == {}
+
+
+def test_cancelar_com_resumo_defasado_nao_fica_negativo(client, db, criar_usuario, criar_profissional, paciente):
+    cabecalhos = criar_usuario("admin@teste.com")
+    profissional = criar_profissional()
+    # Consultas gravadas sem passar pelo resumo (p.ex. antes do backfill)
+    for hora in (9, 10):
+        db.add(models.Consulta(
+            paciente_id=paciente.id,
+            profissional_id=profissional.id,
+            data_hora=datetime.combine(DIA, time(hora)),
+        ))
+    db.commit()
+    consulta_id = db.query(models.Consulta.id).order_by(models.Consulta.id).first()[0]
+
+    assert client.put(f"/consultas/{consulta_id}/cancelar", headers=cabecalhos).status_code == 200
+
+    assert _resumo(db) == {
+        (profissional.id, DIA, AGENDADA): 1,
+        (profissional.id, DIA, CANCELADA): 1,
+    }
+
+
+def test_reconstruir_coincide_com_incremental(client, db, criar_usuario, criar_profissional, paciente):
+    cabecalhos = criar_usuario("admin@teste.com")
+    a, b = criar_profissional(), criar_profissional()
+    ids = [_agendar(client, cabecalhos, paciente, p, as_(hora))["id"] for p in (a, b) for hora in (9, 10, 11)]
+    for consulta_id in ids[::2]:
+        client.put(f"/consultas/{consulta_id}/cancelar", headers=cabecalhos)
+    incremental = _resumo(db)
+
+    with engine.begin() as conn:
+        conn.execute(delete(models.ResumoAgenda.__table__))
+    relatorios.preparar(engine)
+
+    assert _resumo(db) == incremental
+
+
+def test_cancelamentos_concorrentes_contam_uma_vez(client, db, criar_usuario, criar_profissional, paciente):
+    cabecalhos = criar_usuario("admin@teste.com")
+    profissional = criar_profissional()
+    consulta_id = _agendar(client, cabecalhos, paciente, profissional, as_(9))["id"]
+
+    # As duas sessões leem a consulta como AGENDADA antes de qualquer commit
+    primeira, segunda = SessionLocal(), SessionLocal()
+    try:
+        na_primeira = primeira.get(models.Consulta, consulta_id)
+        na_segunda = segunda.get(models.Consulta, consulta_id)
+        assert na_primeira.status == na_segunda.status == AGENDADA
+
+        assert relatorios.mudar_status(primeira, na_primeira, CANCELADA) is True
+        primeira.commit()
+        assert relatorios.mudar_status(segunda, na_segunda, CANCELADA) is False
+        segunda.commit()
+    finally:
+        primeira.close()
+        segunda.close()
+
+    assert _resumo(db) == {(profissional.id, DIA, AGENDADA): 0, (profissional.id, DIA, CANCELADA): 1}
+    geral = _relatorio(client, cabecalhos)["geral"]
+    assert (geral["agendadas"], geral["canceladas"]) == (0, 1)
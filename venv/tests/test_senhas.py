@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app import config, models, senhas
+
+SENHA = "SenhaForte123"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def pool_de_hash():
+    yield
+    senhas.encerrar()
+
+
+@pytest.fixture
+def vagas(monkeypatch):
+    """
+    Troca as vagas do pool por uma só, para saturar sem depender de
+    HASH_MAX_PENDENTES.
+    """
+    unica = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(senhas, "_vagas", unica)
+    return unica
+
+
+def _usuario(db, email, senha_hash):
+    db.add(models.Usuario(email=email, senha_hash=senha_hash, role=models.RoleEnum.ADMIN, ativo=True))
+    db.commit()
+
+
+def _login(client, email, senha):
+    return client.post("/auth/login", data={"username": email, "password": senha})
+
+
+def _hash_gravado(db, email) -> str:
+    db.expire_all()
+    return db.query(models.Usuario.senha_hash).filter(models.Usuario.email == email).scalar()
+
+
+# --------- Hash e verificação ---------
+
+def test_gerar_e_verificar():
+    armazenado = asyncio.run(senhas.gerar_hash(SENHA))
+
+    assert armazenado.startswith(f"$2b${config.BCRYPT_ROUNDS:02d}$")
+    assert asyncio.run(senhas.verificar(SENHA, armazenado)) is True
+    assert asyncio.run(senhas.verificar("outra", armazenado)) is False
+
+
+def test_senha_longa_usa_os_primeiros_72_bytes():
+    longa = "á" * 50  # 100 bytes em UTF-8
+    armazenado = asyncio.run(senhas.gerar_hash(longa))
+
+    assert asyncio.run(senhas.verificar(longa, armazenado)) is True
+    assert asyncio.run(senhas.verificar(longa[:36], armazenado)) is True
+
+
+def test_senha_legada_em_texto_puro():
+    assert asyncio.run(senhas.verificar(SENHA, SENHA)) is True
+    assert asyncio.run(senhas.verificar("outra", SENHA)) is False
+
+
+def test_precisa_rehash():
+    assert senhas.precisa_rehash(SENHA) is True
+    assert senhas.precisa_rehash(senhas.calcular_hash(SENHA, config.BCRYPT_ROUNDS + 1)) is True
+    assert senhas.precisa_rehash(senhas.calcular_hash(SENHA, config.BCRYPT_ROUNDS)) is False
+
+
+# --------- Rotas ---------
+
+def test_signup_grava_hash_e_login_funciona(client, db):
+    resposta = client.post("/auth/signup", json={"email": "novo@teste.com", "senha": SENHA, "role": "ADMIN"})
+    assert resposta.status_code == 200
+
+    assert _hash_gravado(db, "novo@teste.com").startswith("$2b$")
+    assert _login(client, "novo@teste.com", SENHA).json()["token_type"] == "bearer"
+    assert _login(client, "novo@teste.com", "errada").status_code == 401
+    assert _login(client, "ninguem@teste.com", SENHA).status_code == 401
+
+
+@pytest.mark.parametrize("armazenado", [
+    SENHA,                                                   # texto puro (legado)
+    senhas.calcular_hash(SENHA, config.BCRYPT_ROUNDS + 1),  # custo antigo
+])
+def test_login_refaz_hash_legado(client, db, armazenado):
+    _usuario(db, "legado@teste.com", armazenado)
+
+    # A tarefa em segundo plano termina antes do TestClient devolver a resposta
+    assert _login(client, "legado@teste.com", SENHA).status_code == 200
+
+    novo = _hash_gravado(db, "legado@teste.com")
+    assert novo != armazenado
+    assert not senhas.precisa_rehash(novo)
+    assert _login(client, "legado@teste.com", SENHA).status_code == 200
+
+
+def test_login_com_senha_errada_nao_refaz_hash(client, db):
+    _usuario(db, "legado@teste.com", SENHA)
+
+    assert _login(client, "legado@teste.com", "errada").status_code == 401
+    assert _hash_gravado(db, "legado@teste.com") == SENHA
+
+
+# --------- Saturação ---------
+
+def test_pool_saturado_responde_503(client, db, vagas):
+    _usuario(db, "admin@teste.com", senhas.calcular_hash(SENHA, config.BCRYPT_ROUNDS))
+    vagas.acquire()
+    try:
+        for resposta in (
+            _login(client, "admin@teste.com", SENHA),
+            _login(client, "ninguem@teste.com", SENHA),
+            client.post("/auth/signup", json={"email": "novo@teste.com", "senha": SENHA, "role": "ADMIN"}),
+        ):
+            assert resposta.status_code == 503
+            assert resposta.headers["Retry-After"] == "1"
+    finally:
+        vagas.release()
+
+    assert _login(client, "admin@teste.com", SENHA).status_code == 200
+
+
+def test_timeout_vira_saturado_e_segura_a_vaga(vagas, monkeypatch):
+    monkeypatch.setattr(senhas, "TIMEOUT_SEGUNDOS", 0.01)
+
+    with pytest.raises(senhas.PoolSenhasSaturado):
+        asyncio.run(senhas._executar(senhas.calcular_hash, SENHA, 12))
+
+    # O hash continua rodando no processo: a vaga só volta quando ele termina
+    assert vagas.acquire(blocking=False) is False
+    limite = time.monotonic() + 30
+    while not vagas.acquire(blocking=False):
+        assert time.monotonic() < limite
+        time.sleep(0.05)
+    vagas.release()